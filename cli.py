@@ -6,28 +6,87 @@ import asyncio
 import sys
 import os
 import argparse
+import contextlib
+import functools
+import json
+import socket
+import sqlite3
+import threading
 from pathlib import Path
 from datetime import datetime
-import json
+from typing import Dict, List, Optional
+import logging
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.config import Config
-from src.workflow_engine import WorkflowEngine
-from src.llm_client import LLMClient
-import logging
-
 # Configure logging
+_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=_LOG_FORMAT,
     handlers=[
         logging.StreamHandler(sys.stdout)
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Unix domain socket used by the long-running CLI daemon
+DAEMON_SOCKET_PATH = Path.home() / ".agenticquant" / "cli.sock"
+
+
+class _SafeNameTable(dict):
+    """str.translate table keeping alphanumerics and mapping everything else to "_".
+    
+    Latin-1 is filled in up front; other code points are classified on first sight.
+    """
+    
+    def __missing__(self, codepoint: int):
+        value = codepoint if chr(codepoint).isalnum() else "_"
+        self[codepoint] = value
+        return value
+
+
+_SAFE_NAME_TABLE = _SafeNameTable(
+    (i, i if chr(i).isalnum() else "_") for i in range(256)
+)
+
+
+# Workspace index kept in workspaces/.index.db (see AgenticQuantCLI._scan_workspaces)
+_WORKSPACE_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workspaces (
+    session_id TEXT PRIMARY KEY,
+    created_ts INTEGER,
+    task TEXT,
+    status TEXT,
+    size_bytes INTEGER,
+    report_path TEXT
+);
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _get_config():
+    """Load the system configuration once, on demand (keeps --help/--list fast)."""
+    from src.config import config
+    return config
+
+
+def make_session_id(request: str) -> str:
+    """Build a timestamped, filesystem-safe session ID from a request."""
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    safe_name = request[:50].translate(_SAFE_NAME_TABLE)
+    return f"{timestamp}_{safe_name}"
+
+
+def _clear_screen():
+    """Clear the terminal (ANSI escape on POSIX instead of spawning `clear`)."""
+    if os.name == 'nt':
+        os.system('cls')
+    else:
+        sys.stdout.write("\x1b[2J\x1b[H")
+        sys.stdout.flush()
+
 
 class Colors:
     """ANSI color codes for terminal output."""
@@ -42,19 +101,9 @@ class Colors:
     UNDERLINE = '\033[4m'
 
 
-class AgenticQuantCLI:
-    """Command-line interface for AgenticQuant system."""
-    
-    def __init__(self):
-        """Initialize the CLI."""
-        self.config = Config()
-        self.engine = WorkflowEngine()
-        self.workspaces_dir = Path(__file__).parent / "workspaces"
-        self.workspaces_dir.mkdir(exist_ok=True)
-        
-    def print_banner(self):
-        """Print the CLI banner."""
-        banner = f"""
+# Display templates are built once at import; only the per-call fields are
+# filled in with format_map, and each is written with a single write() call
+_BANNER_TEMPLATE = f"""
 {Colors.OKBLUE}{Colors.BOLD}
 ╔═══════════════════════════════════════════════════════════════╗
 ║                                                               ║
@@ -66,9 +115,9 @@ class AgenticQuantCLI:
 {Colors.ENDC}
 
 {Colors.OKCYAN}Configuration:{Colors.ENDC}
-  • Provider: {Colors.OKGREEN}{self.config.DEFAULT_LLM_PROVIDER}{Colors.ENDC}
-  • Model: {Colors.OKGREEN}{self.config.DEFAULT_MODEL}{Colors.ENDC}
-  • Workspaces: {Colors.OKGREEN}{self.workspaces_dir}{Colors.ENDC}
+  • Provider: {Colors.OKGREEN}{{provider}}{Colors.ENDC}
+  • Model: {Colors.OKGREEN}{{model}}{Colors.ENDC}
+  • Workspaces: {Colors.OKGREEN}{{workspaces}}{Colors.ENDC}
 
 {Colors.WARNING}Commands:{Colors.ENDC}
   • Type your analytical request (e.g., "Develop a momentum strategy for AAPL")
@@ -77,12 +126,10 @@ class AgenticQuantCLI:
   • Press {Colors.BOLD}Ctrl+C{Colors.ENDC} to interrupt
 
 {Colors.HEADER}═══════════════════════════════════════════════════════════════{Colors.ENDC}
+
 """
-        print(banner)
-    
-    def print_help(self):
-        """Print help message."""
-        help_text = f"""
+
+_HELP_TEXT = f"""
 {Colors.OKBLUE}{Colors.BOLD}Available Commands:{Colors.ENDC}
 
 {Colors.OKCYAN}Analysis Commands:{Colors.ENDC}
@@ -110,61 +157,186 @@ class AgenticQuantCLI:
   • Strategy code (Python)
   • Backtest results
   • Final report (Markdown)
+
+"""
+
+_STATUS_TEMPLATE = f"""
+{Colors.OKBLUE}{Colors.BOLD}System Status:{Colors.ENDC}
+
+  • LLM Provider: {Colors.OKGREEN}{{provider}}{Colors.ENDC}
+  • Model: {Colors.OKGREEN}{{model}}{Colors.ENDC}
+  • Workspaces Directory: {Colors.OKGREEN}{{workspaces}}{Colors.ENDC}
+  • Total Workspaces: {Colors.OKGREEN}{{total}}{Colors.ENDC}
+  • Completed: {Colors.OKGREEN}{{completed}}{Colors.ENDC}
+  • Incomplete: {Colors.WARNING}{{incomplete}}{Colors.ENDC}
+
 """
-        print(help_text)
+
+
+class AgenticQuantCLI:
+    """Command-line interface for AgenticQuant system."""
+    
+    def __init__(self):
+        """Initialize the CLI."""
+        self.config = _get_config()
+        self.config.ensure_dirs()
+        self._engine = None
+        self._prompt_session = None  # prompt_toolkit session (False if unavailable)
+        self.workspaces_dir = Path(__file__).parent / "workspaces"
+        self.workspaces_dir.mkdir(exist_ok=True)
+    
+    @property
+    def engine(self):
+        """Workflow engine, built on first use so non-analysis commands skip the heavy imports."""
+        if self._engine is None:
+            from src.workflow_engine import WorkflowEngine
+            self._engine = WorkflowEngine()
+        return self._engine
+        
+    def print_banner(self):
+        """Print the CLI banner."""
+        sys.stdout.write(_BANNER_TEMPLATE.format_map({
+            "provider": self.config.DEFAULT_LLM_PROVIDER,
+            "model": self.config.DEFAULT_MODEL,
+            "workspaces": self.workspaces_dir
+        }))
+    
+    def print_help(self):
+        """Print help message."""
+        sys.stdout.write(_HELP_TEXT)
+    
+    def _open_index(self) -> sqlite3.Connection:
+        """Open the SQLite workspace index (workspaces/.index.db), creating it if needed."""
+        conn = sqlite3.connect(self.workspaces_dir / ".index.db")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_WORKSPACE_INDEX_SCHEMA)
+        return conn
+    
+    def _index_workspace(self, conn: sqlite3.Connection, session_id: str, created_ts: Optional[int] = None):
+        """Insert or refresh a workspace's row in the index."""
+        path = self.workspaces_dir / session_id
+        if created_ts is None:
+            created_ts = int(path.stat().st_ctime)
+        
+        report_path = path / "final_report.md"
+        try:
+            size = report_path.stat().st_size
+            status = "complete"
+        except OSError:
+            size = 0
+            status = "incomplete"
+        
+        name_parts = session_id.split("_", 3)
+        task = name_parts[3].replace("_", " ") if len(name_parts) >= 4 else session_id
+        
+        conn.execute(
+            "INSERT OR REPLACE INTO workspaces VALUES (?, ?, ?, ?, ?, ?)",
+            (session_id, created_ts, task, status, size, str(report_path) if status == "complete" else None)
+        )
+    
+    def _record_workspace(self, session_id: str):
+        """Record a workspace in the index once its analysis has finished."""
+        try:
+            with contextlib.closing(self._open_index()) as conn:
+                with conn:
+                    self._index_workspace(conn, session_id)
+        except (OSError, sqlite3.Error):
+            logger.debug("Could not update workspace index", exc_info=True)
+    
+    def _scan_workspaces(self) -> List[Dict]:
+        """
+        List workspaces, newest first, from the SQLite index.
+        
+        Entries are added as run_analysis finishes. The directory listing is only
+        diffed against the index (no per-workspace stat) to pick up workspaces
+        created elsewhere, e.g. by the web server, or removed by hand; incomplete
+        workspaces are re-checked since their report may have appeared since.
+        
+        Returns:
+            [{"name": str, "path": str, "complete": bool, "size": int}]
+        """
+        with os.scandir(self.workspaces_dir) as it:
+            entries = {entry.name: entry for entry in it if entry.is_dir()}
+        
+        with contextlib.closing(self._open_index()) as conn:
+            with conn:
+                indexed = {row[0] for row in conn.execute("SELECT session_id FROM workspaces")}
+                
+                for name in indexed - entries.keys():
+                    conn.execute("DELETE FROM workspaces WHERE session_id = ?", (name,))
+                for name in entries.keys() - indexed:
+                    self._index_workspace(conn, name, int(entries[name].stat().st_ctime))
+                for (name,) in conn.execute(
+                    "SELECT session_id FROM workspaces WHERE status != 'complete'"
+                ).fetchall():
+                    self._index_workspace(conn, name)
+            
+            rows = conn.execute(
+                "SELECT session_id, status, size_bytes FROM workspaces ORDER BY session_id DESC"
+            ).fetchall()
+        
+        return [
+            {
+                "name": name,
+                "path": str(self.workspaces_dir / name),
+                "complete": status == "complete",
+                "size": size
+            }
+            for name, status, size in rows
+        ]
     
     def list_workspaces(self):
         """List all previous workspaces."""
-        workspaces = sorted(self.workspaces_dir.glob("*"), reverse=True)
+        workspaces = self._scan_workspaces()
         
         if not workspaces:
             print(f"{Colors.WARNING}No workspaces found.{Colors.ENDC}\n")
             return
         
-        print(f"\n{Colors.OKBLUE}{Colors.BOLD}Previous Workspaces:{Colors.ENDC}\n")
+        lines = [f"\n{Colors.OKBLUE}{Colors.BOLD}Previous Workspaces:{Colors.ENDC}\n"]
         
         for i, ws in enumerate(workspaces[:10], 1):  # Show last 10
             # Parse workspace name
-            name_parts = ws.name.split("_", 3)
+            name_parts = ws["name"].split("_", 3)
             if len(name_parts) >= 4:
                 date = name_parts[0]
                 time = name_parts[1]
                 task = name_parts[3].replace("_", " ")[:50]
             else:
-                date, time, task = "N/A", "N/A", ws.name[:50]
+                date, time, task = "N/A", "N/A", ws["name"][:50]
             
             # Check for final report
-            report_path = ws / "final_report.md"
-            status = f"{Colors.OKGREEN}✓ Complete{Colors.ENDC}" if report_path.exists() else f"{Colors.WARNING}⚠ Incomplete{Colors.ENDC}"
+            status = f"{Colors.OKGREEN}✓ Complete{Colors.ENDC}" if ws["complete"] else f"{Colors.WARNING}⚠ Incomplete{Colors.ENDC}"
             
-            print(f"  {i}. {Colors.OKCYAN}{date} {time}{Colors.ENDC}")
-            print(f"     Task: {task}")
-            print(f"     Status: {status}")
-            print(f"     Path: {Colors.BOLD}{ws}{Colors.ENDC}\n")
+            lines.append(f"  {i}. {Colors.OKCYAN}{date} {time}{Colors.ENDC}")
+            lines.append(f"     Task: {task}")
+            lines.append(f"     Status: {status}")
+            lines.append(f"     Path: {Colors.BOLD}{ws['path']}{Colors.ENDC}\n")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def show_status(self):
         """Show system status."""
-        print(f"\n{Colors.OKBLUE}{Colors.BOLD}System Status:{Colors.ENDC}\n")
-        print(f"  • LLM Provider: {Colors.OKGREEN}{self.config.DEFAULT_LLM_PROVIDER}{Colors.ENDC}")
-        print(f"  • Model: {Colors.OKGREEN}{self.config.DEFAULT_MODEL}{Colors.ENDC}")
-        print(f"  • Workspaces Directory: {Colors.OKGREEN}{self.workspaces_dir}{Colors.ENDC}")
-        
-        # Count workspaces
-        workspaces = list(self.workspaces_dir.glob("*"))
-        completed = sum(1 for ws in workspaces if (ws / "final_report.md").exists())
+        workspaces = self._scan_workspaces()
+        completed = sum(1 for ws in workspaces if ws["complete"])
         
-        print(f"  • Total Workspaces: {Colors.OKGREEN}{len(workspaces)}{Colors.ENDC}")
-        print(f"  • Completed: {Colors.OKGREEN}{completed}{Colors.ENDC}")
-        print(f"  • Incomplete: {Colors.WARNING}{len(workspaces) - completed}{Colors.ENDC}\n")
+        sys.stdout.write(_STATUS_TEMPLATE.format_map({
+            "provider": self.config.DEFAULT_LLM_PROVIDER,
+            "model": self.config.DEFAULT_MODEL,
+            "workspaces": self.workspaces_dir,
+            "total": len(workspaces),
+            "completed": completed,
+            "incomplete": len(workspaces) - completed
+        }))
     
     def show_config(self):
         """Show current configuration."""
-        print(f"\n{Colors.OKBLUE}{Colors.BOLD}Configuration:{Colors.ENDC}\n")
+        lines = [f"\n{Colors.OKBLUE}{Colors.BOLD}Configuration:{Colors.ENDC}\n"]
         
         # LLM Config
-        print(f"{Colors.OKCYAN}LLM Configuration:{Colors.ENDC}")
-        print(f"  • Provider: {Colors.OKGREEN}{self.config.DEFAULT_LLM_PROVIDER}{Colors.ENDC}")
-        print(f"  • Model: {Colors.OKGREEN}{self.config.DEFAULT_MODEL}{Colors.ENDC}")
+        lines.append(f"{Colors.OKCYAN}LLM Configuration:{Colors.ENDC}")
+        lines.append(f"  • Provider: {Colors.OKGREEN}{self.config.DEFAULT_LLM_PROVIDER}{Colors.ENDC}")
+        lines.append(f"  • Model: {Colors.OKGREEN}{self.config.DEFAULT_MODEL}{Colors.ENDC}")
         
         # Show which API keys are configured
         providers = []
@@ -175,65 +347,86 @@ class AgenticQuantCLI:
         if self.config.SILICONFLOW_API_KEY:
             providers.append(f"SiliconFlow ({Colors.OKGREEN}✓{Colors.ENDC})")
         
-        print(f"  • Available Providers: {', '.join(providers)}")
+        lines.append(f"  • Available Providers: {', '.join(providers)}")
         
         # Directories
-        print(f"\n{Colors.OKCYAN}Directories:{Colors.ENDC}")
-        print(f"  • Project Root: {Colors.OKGREEN}{Path(__file__).parent}{Colors.ENDC}")
-        print(f"  • Workspaces: {Colors.OKGREEN}{self.workspaces_dir}{Colors.ENDC}")
-        print(f"  • Logs: {Colors.OKGREEN}{Path(__file__).parent / 'logs'}{Colors.ENDC}\n")
+        lines.append(f"\n{Colors.OKCYAN}Directories:{Colors.ENDC}")
+        lines.append(f"  • Project Root: {Colors.OKGREEN}{Path(__file__).parent}{Colors.ENDC}")
+        lines.append(f"  • Workspaces: {Colors.OKGREEN}{self.workspaces_dir}{Colors.ENDC}")
+        lines.append(f"  • Logs: {Colors.OKGREEN}{Path(__file__).parent / 'logs'}{Colors.ENDC}\n")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
     async def run_analysis(self, request: str):
         """Run an analysis task."""
-        print(f"\n{Colors.OKBLUE}{Colors.BOLD}Starting Analysis...{Colors.ENDC}\n")
-        print(f"{Colors.OKCYAN}Request:{Colors.ENDC} {request}\n")
-        
         # Create session ID
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        safe_name = "".join(c if c.isalnum() else "_" for c in request[:50])
-        session_id = f"{timestamp}_{safe_name}"
+        session_id = make_session_id(request)
         
         # The workspace will be created by the engine
         workspace_path = self.workspaces_dir / session_id
         
-        print(f"{Colors.OKGREEN}✓{Colors.ENDC} Session: {Colors.BOLD}{session_id}{Colors.ENDC}")
-        print(f"{Colors.OKGREEN}✓{Colors.ENDC} Workspace: {Colors.BOLD}{workspace_path}{Colors.ENDC}\n")
+        sys.stdout.write(
+            f"\n{Colors.OKBLUE}{Colors.BOLD}Starting Analysis...{Colors.ENDC}\n\n"
+            f"{Colors.OKCYAN}Request:{Colors.ENDC} {request}\n\n"
+            f"{Colors.OKGREEN}✓{Colors.ENDC} Session: {Colors.BOLD}{session_id}{Colors.ENDC}\n"
+            f"{Colors.OKGREEN}✓{Colors.ENDC} Workspace: {Colors.BOLD}{workspace_path}{Colors.ENDC}\n\n"
+        )
         
         try:
-            # Run workflow
-            result = await self.engine.execute_workflow(
+            # Run workflow as a task and stream its progress while it runs
+            progress = asyncio.Queue()
+            task = asyncio.create_task(self.engine.execute_workflow(
                 user_request=request,
-                session_id=session_id
-            )
+                session_id=session_id,
+                progress_queue=progress
+            ))
+            try:
+                while not task.done():
+                    try:
+                        message = await asyncio.wait_for(progress.get(), timeout=0.5)
+                    except asyncio.TimeoutError:
+                        continue
+                    print(f"{Colors.OKCYAN}»{Colors.ENDC} {message}")
+            finally:
+                if not task.done():
+                    task.cancel()
+            while not progress.empty():
+                print(f"{Colors.OKCYAN}»{Colors.ENDC} {progress.get_nowait()}")
+            result = await task
+            self._record_workspace(Path(result.workspace_path).name)
             
             # Display results
-            print(f"\n{Colors.OKGREEN}{Colors.BOLD}{'═' * 60}{Colors.ENDC}")
-            print(f"{Colors.OKGREEN}{Colors.BOLD}Analysis Complete!{Colors.ENDC}")
-            print(f"{Colors.OKGREEN}{Colors.BOLD}{'═' * 60}{Colors.ENDC}\n")
+            lines = [
+                f"\n{Colors.OKGREEN}{Colors.BOLD}{'═' * 60}{Colors.ENDC}",
+                f"{Colors.OKGREEN}{Colors.BOLD}Analysis Complete!{Colors.ENDC}",
+                f"{Colors.OKGREEN}{Colors.BOLD}{'═' * 60}{Colors.ENDC}\n"
+            ]
             
-            print(f"{Colors.OKCYAN}Results:{Colors.ENDC}")
-            print(f"  • Session ID: {Colors.BOLD}{result.session_id}{Colors.ENDC}")
-            print(f"  • Workspace: {Colors.BOLD}{result.workspace_path}{Colors.ENDC}")
-            print(f"  • Status: {Colors.BOLD}{result.status}{Colors.ENDC}")
+            lines.append(f"{Colors.OKCYAN}Results:{Colors.ENDC}")
+            lines.append(f"  • Session ID: {Colors.BOLD}{result.session_id}{Colors.ENDC}")
+            lines.append(f"  • Workspace: {Colors.BOLD}{result.workspace_path}{Colors.ENDC}")
+            lines.append(f"  • Status: {Colors.BOLD}{result.status}{Colors.ENDC}")
             
             # List generated files
             ws_path = Path(result.workspace_path)
             if ws_path.exists():
                 files = list(ws_path.glob("*"))
-                print(f"\n{Colors.OKCYAN}Generated Files ({len(files)}):{Colors.ENDC}")
+                lines.append(f"\n{Colors.OKCYAN}Generated Files ({len(files)}):{Colors.ENDC}")
                 for f in sorted(files):
                     if f.is_file():
                         size = f.stat().st_size
                         size_str = f"{size:,} bytes" if size < 1024 else f"{size/1024:.1f} KB"
-                        print(f"  • {Colors.BOLD}{f.name}{Colors.ENDC} ({size_str})")
+                        lines.append(f"  • {Colors.BOLD}{f.name}{Colors.ENDC} ({size_str})")
                 
                 # Show final report path
                 report_path = ws_path / "final_report.md"
                 if report_path.exists():
-                    print(f"\n{Colors.OKGREEN}✓{Colors.ENDC} Final report: {Colors.BOLD}{report_path}{Colors.ENDC}")
-                    print(f"\n{Colors.WARNING}Tip:{Colors.ENDC} Open the report with: {Colors.BOLD}open {report_path}{Colors.ENDC}")
+                    lines.append(f"\n{Colors.OKGREEN}✓{Colors.ENDC} Final report: {Colors.BOLD}{report_path}{Colors.ENDC}")
+                    lines.append(f"\n{Colors.WARNING}Tip:{Colors.ENDC} Open the report with: {Colors.BOLD}open {report_path}{Colors.ENDC}")
             
-            print(f"\n{Colors.OKGREEN}{Colors.BOLD}{'═' * 60}{Colors.ENDC}\n")
+            lines.append(f"\n{Colors.OKGREEN}{Colors.BOLD}{'═' * 60}{Colors.ENDC}\n")
+            
+            sys.stdout.write("\n".join(lines) + "\n")
             
             return True
             
@@ -246,6 +439,21 @@ class AgenticQuantCLI:
             logger.exception("Analysis error")
             return False
     
+    async def read_input(self, prompt: str) -> str:
+        """Read a line without blocking the event loop."""
+        if self._prompt_session is None:
+            try:
+                from prompt_toolkit import PromptSession
+                self._prompt_session = PromptSession()
+            except ImportError:
+                self._prompt_session = False
+        
+        if self._prompt_session:
+            from prompt_toolkit.formatted_text import ANSI
+            return await self._prompt_session.prompt_async(ANSI(prompt))
+        
+        return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+    
     async def interactive_loop(self):
         """Run the interactive CLI loop."""
         self.print_banner()
@@ -253,7 +461,7 @@ class AgenticQuantCLI:
         while True:
             try:
                 # Prompt
-                user_input = input(f"{Colors.BOLD}{Colors.OKGREEN}AgenticQuant>{Colors.ENDC} ").strip()
+                user_input = (await self.read_input(f"{Colors.BOLD}{Colors.OKGREEN}AgenticQuant>{Colors.ENDC} ")).strip()
                 
                 if not user_input:
                     continue
@@ -278,7 +486,7 @@ class AgenticQuantCLI:
                     self.show_config()
                 
                 elif command == 'clear':
-                    os.system('clear' if os.name != 'nt' else 'cls')
+                    _clear_screen()
                     self.print_banner()
                 
                 else:
@@ -296,13 +504,222 @@ class AgenticQuantCLI:
                 logger.exception("CLI error")
 
 
-async def main():
-    """Main entry point."""
-    # Parse command-line arguments
-    parser = argparse.ArgumentParser(
-        description='AgenticQuant CLI - Multi-Agent Quantitative Analysis System',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+class _DaemonOutputStream:
+    """File-like object that forwards printed lines to a daemon client."""
+    
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self._pending = ""
+    
+    def write(self, text: str) -> int:
+        if "\n" not in text:
+            self._pending += text
+            return len(text)
+        # Only the incoming text is split; the buffered partial line prefixes its first piece
+        lines = text.split("\n")
+        lines[0] = self._pending + lines[0]
+        self._pending = lines.pop()
+        for line in lines:
+            _send_daemon_message(self.writer, {"type": "log", "line": line})
+        return len(text)
+    
+    def flush(self):
+        if self._pending:
+            _send_daemon_message(self.writer, {"type": "log", "line": self._pending})
+            self._pending = ""
+
+
+class _DaemonLogHandler(logging.Handler):
+    """Logging handler that forwards records to a daemon client for one request.
+    
+    logging.basicConfig bound its StreamHandler to the original sys.stdout, so
+    redirect_stdout alone does not reach log records.
+    """
+    
+    def __init__(self, output: _DaemonOutputStream):
+        super().__init__()
+        self.output = output
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            line = self.format(record) + "\n"
+        except Exception:
+            self.handleError(record)
+            return
+        # Records logged from worker threads (asyncio.to_thread) are handed to the loop
+        if threading.get_ident() == self._thread_id:
+            self.output.write(line)
+        else:
+            self._loop.call_soon_threadsafe(self.output.write, line)
+
+
+async def _drain_periodically(writer: asyncio.StreamWriter, interval: float = 0.5):
+    """Flush a client's transport buffer while a long request keeps writing to it."""
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            await writer.drain()
+    except ConnectionError:
+        # Client went away; the request keeps running and its final drain reports it
+        pass
+
+
+def _send_daemon_message(writer: asyncio.StreamWriter, message: dict):
+    """Write one newline-delimited JSON message to a daemon client."""
+    writer.write((json.dumps(message) + "\n").encode("utf-8"))
+
+
+class CLIDaemon:
+    """Long-lived process serving analysis requests over a Unix domain socket.
+    
+    Keeps the workflow engine (LLM SDKs, pandas, tool registry) imported so
+    repeated `python cli.py --connect ...` calls skip the bootstrap cost.
+    """
+    
+    def __init__(self, cli: "AgenticQuantCLI", socket_path: Path = DAEMON_SOCKET_PATH):
+        self.cli = cli
+        self.socket_path = socket_path
+        # stdout is redirected per request, so requests are served one at a time
+        self._lock = asyncio.Lock()
+        self._stop_event: Optional[asyncio.Event] = None
+    
+    async def serve(self):
+        """Listen for requests until a stop command arrives."""
+        self._stop_event = asyncio.Event()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        
+        # Pay the heavy import/bootstrap cost once, up front
+        self.cli.engine
+        
+        server = await asyncio.start_unix_server(self._handle_client, path=str(self.socket_path))
+        print(f"{Colors.OKGREEN}✓{Colors.ENDC} AgenticQuant daemon listening on {Colors.BOLD}{self.socket_path}{Colors.ENDC}")
+        try:
+            async with server:
+                await self._stop_event.wait()
+        finally:
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+        print(f"{Colors.OKCYAN}Daemon stopped.{Colors.ENDC}")
+    
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            raw = await reader.readline()
+            try:
+                request = json.loads(raw or b"{}")
+            except json.JSONDecodeError:
+                request = {}
+            
+            if request.get("command") == "stop":
+                _send_daemon_message(writer, {"type": "stopped"})
+                self._stop_event.set()
+                return
+            
+            prompt = request.get("prompt")
+            if not prompt:
+                _send_daemon_message(writer, {"type": "result", "success": False, "error": "No prompt provided"})
+                return
+            
+            session_id = request.get("session_id") or make_session_id(prompt)
+            async with self._lock:
+                output = _DaemonOutputStream(writer)
+                log_handler = _DaemonLogHandler(output)
+                log_handler.setFormatter(logging.Formatter(_LOG_FORMAT))
+                root_logger = logging.getLogger()
+                root_logger.addHandler(log_handler)
+                drainer = asyncio.create_task(_drain_periodically(writer))
+                with contextlib.redirect_stdout(output):
+                    try:
+                        result = await self.cli.engine.execute_workflow(
+                            user_request=prompt,
+                            session_id=session_id
+                        )
+                        response = {
+                            "type": "result",
+                            "success": True,
+                            "session_id": result.session_id,
+                            "workspace_path": result.workspace_path,
+                            "status": result.status
+                        }
+                    except Exception as e:
+                        logger.exception("Daemon analysis error")
+                        response = {
+                            "type": "result",
+                            "success": False,
+                            "session_id": session_id,
+                            "error": str(e)
+                        }
+                    finally:
+                        root_logger.removeHandler(log_handler)
+                        drainer.cancel()
+                        output.flush()
+            _send_daemon_message(writer, response)
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def _connect_to_daemon(socket_path: Path = DAEMON_SOCKET_PATH) -> Optional[socket.socket]:
+    """Open a connection to a running daemon, or return None if none is listening."""
+    if not hasattr(socket, "AF_UNIX") or not socket_path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def forward_to_daemon(prompt: str, socket_path: Path = DAEMON_SOCKET_PATH) -> Optional[bool]:
+    """
+    Run a prompt on a running daemon, streaming its output to this terminal.
+    
+    Returns:
+        The analysis success flag, or None when no daemon is reachable
+    """
+    sock = _connect_to_daemon(socket_path)
+    if sock is None:
+        return None
+    
+    success = False
+    with sock, sock.makefile("r", encoding="utf-8") as stream:
+        sock.sendall((json.dumps({"prompt": prompt}) + "\n").encode("utf-8"))
+        for line in stream:
+            message = json.loads(line)
+            if message.get("type") == "log":
+                print(message.get("line", ""))
+            elif message.get("type") == "result":
+                success = bool(message.get("success"))
+                if success:
+                    print(f"\n{Colors.OKGREEN}✓{Colors.ENDC} Workspace: {Colors.BOLD}{message.get('workspace_path')}{Colors.ENDC}")
+                    print(f"{Colors.OKGREEN}✓{Colors.ENDC} Status: {Colors.BOLD}{message.get('status')}{Colors.ENDC}\n")
+                else:
+                    print(f"\n{Colors.FAIL}✗ Error during analysis:{Colors.ENDC}")
+                    print(f"{Colors.FAIL}{message.get('error')}{Colors.ENDC}\n")
+    return success
+
+
+def stop_daemon(socket_path: Path = DAEMON_SOCKET_PATH) -> bool:
+    """Ask a running daemon to shut down. Returns False if none is running."""
+    sock = _connect_to_daemon(socket_path)
+    if sock is None:
+        return False
+    with sock, sock.makefile("r", encoding="utf-8") as stream:
+        sock.sendall((json.dumps({"command": "stop"}) + "\n").encode("utf-8"))
+        stream.readline()
+    return True
+
+
+CLI_EPILOG = """
 Examples:
   # Interactive mode (default)
   python cli.py
@@ -318,7 +735,29 @@ Examples:
   
   # Debug mode with verbose logging
   python cli.py --debug "Build a mean reversion strategy for SPY"
+  
+  # Keep a warm daemon running and send prompts to it
+  python cli.py --daemon start
+  python cli.py --connect "Develop a momentum strategy for AAPL"
+  python cli.py --daemon stop
         """
+
+
+def build_quick_parser() -> argparse.ArgumentParser:
+    """Minimal parser that only recognizes the flags handled without running an analysis."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--list', '-l', action='store_true')
+    parser.add_argument('--status', '-s', action='store_true')
+    parser.add_argument('--debug', '-d', action='store_true')
+    return parser
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Full parser, materialized only when an analysis run (or --help) is requested."""
+    parser = argparse.ArgumentParser(
+        description='AgenticQuant CLI - Multi-Agent Quantitative Analysis System',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=CLI_EPILOG
     )
     
     parser.add_argument(
@@ -367,15 +806,67 @@ Examples:
         help='Show system status and exit'
     )
     
-    args = parser.parse_args()
+    parser.add_argument(
+        '--daemon',
+        nargs='?',
+        const='start',
+        choices=['start', 'stop'],
+        help=f'Start (default) or stop a long-running daemon listening on {DAEMON_SOCKET_PATH}'
+    )
+    
+    parser.add_argument(
+        '--connect',
+        action='store_true',
+        help='Send the prompt to a running daemon (falls back to in-process execution if none is running)'
+    )
+    
+    return parser
+
+
+def enable_debug_logging():
+    """Switch the root logger to DEBUG."""
+    logging.getLogger().setLevel(logging.DEBUG)
+    logger.debug("Debug logging enabled")
+
+
+async def main():
+    """Main entry point."""
+    # Phase 1: handle --list/--status without building the full parser
+    quick_args, _ = build_quick_parser().parse_known_args()
+    if quick_args.list or quick_args.status:
+        if quick_args.debug:
+            enable_debug_logging()
+        cli = AgenticQuantCLI()
+        if quick_args.list:
+            cli.list_workspaces()
+        else:
+            cli.show_status()
+        return
+    
+    # Phase 2: full argument parsing for analysis runs and --help
+    args = build_parser().parse_args()
     
     # Set debug logging if requested
     if args.debug:
-        logging.getLogger().setLevel(logging.DEBUG)
-        logger.debug("Debug logging enabled")
+        enable_debug_logging()
     
-    # Initialize CLI
-    cli = AgenticQuantCLI()
+    # Determine prompt (positional argument takes precedence)
+    prompt = args.prompt or args.prompt_arg
+    
+    # Daemon control
+    if args.daemon == 'stop':
+        if stop_daemon():
+            print(f"{Colors.OKCYAN}Daemon stopped.{Colors.ENDC}")
+        else:
+            print(f"{Colors.WARNING}No daemon is running.{Colors.ENDC}")
+        return
+    
+    # Forward to a warm daemon before paying for any heavy imports
+    if args.connect and prompt and args.daemon is None:
+        success = forward_to_daemon(prompt)
+        if success is not None:
+            sys.exit(0 if success else 1)
+        logger.info("No daemon running; executing in-process")
     
     # Override provider if specified
     if args.provider:
@@ -387,19 +878,13 @@ Examples:
         os.environ['DEFAULT_MODEL'] = args.model
         logger.info(f"Using model: {args.model}")
     
-    # Handle --list flag
-    if args.list:
-        cli.list_workspaces()
-        return
+    # Initialize CLI (after the overrides so the lazily loaded config picks them up)
+    cli = AgenticQuantCLI()
     
-    # Handle --status flag
-    if args.status:
-        cli.show_status()
+    if args.daemon == 'start':
+        await CLIDaemon(cli).serve()
         return
     
-    # Determine prompt (positional argument takes precedence)
-    prompt = args.prompt or args.prompt_arg
-    
     if prompt:
         # One-shot mode: run analysis and exit
         print(f"{Colors.OKBLUE}{Colors.BOLD}AgenticQuant CLI - One-Shot Mode{Colors.ENDC}\n")
@@ -411,6 +896,13 @@ Examples:
 
 
 if __name__ == "__main__":
+    # uvloop is a faster drop-in event loop on Linux/macOS; optional
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
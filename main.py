@@ -3,8 +3,18 @@ AgenticQuant - Multi-Agent Quantitative Analysis System
 
 Entry point for the application
 """
+import functools
+import importlib.util
+
 import uvicorn
-from src.config import config
+
+
+@functools.lru_cache(maxsize=1)
+def _get_config():
+    """Load the system configuration once."""
+    from src.config import config
+    return config
+
 
 if __name__ == "__main__":
     print("""
@@ -20,10 +30,16 @@ if __name__ == "__main__":
     Starting server...
     """)
     
+    config = _get_config()
     uvicorn.run(
         "src.main:app",
         host=config.HOST,
         port=config.PORT,
-        reload=True,
-        log_level="info"
+        # Auto-reload is for development only (SERVER_RELOAD=true); it forces a single worker
+        reload=config.SERVER_RELOAD,
+        workers=config.SERVER_WORKERS,
+        log_level="info",
+        # Prefer uvloop and the httptools parser when installed (not available on Windows)
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11"
     )
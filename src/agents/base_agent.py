@@ -1,17 +1,70 @@
 """
 Base Agent with ReAct Loop Implementation
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from abc import ABC, abstractmethod
 from src.mcp.protocol import (
     AgentState, MCPMessage, MessageRole, ToolCall, ToolResult,
-    create_mcp_message, create_tool_call
+    ToolDefinition, ToolParameter, create_mcp_message, create_tool_call
 )
 from src.llm_client import LLMClient
 from src.tools import ToolRegistry
+import asyncio
+import contextlib
 import json
+import logging
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to stdlib json
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize a tool payload to JSON, compact unless indent is requested"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option).decode()
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; let the stdlib encoder handle or report it
+    if indent:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
+
+
+# Special tool that agents call to complete a task early
+FINISH_TOOL = ToolDefinition(
+    name="finish",
+    description="Call this tool when you have completed the task successfully. This will immediately end the current task and move to the next step.",
+    parameters=[
+        ToolParameter(
+            name="message",
+            type="string",
+            description="Final summary message describing what was accomplished",
+            required=False
+        )
+    ],
+    returns={
+        "type": "object",
+        "description": "Confirmation of task completion"
+    }
+)
+
+# Per-task context sent after the agent's (static) system prompt
+_CONTEXT_TEMPLATE = """===== CURRENT CONTEXT =====
+Current Date: {current_date}
+Current Time: {current_time}
+Workspace: {workspace}
+===========================
+
+Remember to use the current date/time information when relevant to your task."""
+
 
 class BaseAgent(ABC):
     """Base class for all agents implementing ReAct pattern"""
@@ -38,6 +91,8 @@ class BaseAgent(ABC):
         )
         
         self.max_iterations = 10  # Max ReAct iterations (reduced to minimize API calls)
+        self.max_history_messages = 8  # Recent assistant/tool messages re-sent verbatim each iteration
+        self.summary_preview_chars = 300  # Length of each compacted observation in the history summary
         self._task_finished = False  # Flag to signal early completion
     
     def finish(self) -> Dict[str, Any]:
@@ -66,6 +121,142 @@ class BaseAgent(ABC):
         """Get list of tools this agent can use"""
         pass
     
+    def _print_tool_call(self, tool_call_data: Dict[str, Any]) -> None:
+        """Display a tool call (debug runs only, so normal runs skip the formatting)"""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        print(f"\n🔧 Tool Call: {tool_call_data['name']}")
+        print(f"   Arguments: {_dumps(tool_call_data.get('arguments', {}), indent=True)}")
+    
+    async def _run_one_tool(self, tool_call_data: Dict[str, Any]) -> Tuple[ToolCall, str]:
+        """Execute a single tool call requested by the LLM and format its observation"""
+        self._print_tool_call(tool_call_data)
+        
+        # Create tool call
+        tool_call = create_tool_call(
+            tool_name=tool_call_data["name"],
+            arguments=tool_call_data["arguments"],
+            agent_id=self.agent_id
+        )
+        self.state.action = tool_call
+        self.state.status = "acting"
+        
+        # Execute tool (tools with shared side effects run one call at a time)
+        tool = self.tool_registry.get_tool(tool_call.tool_name)
+        lock = self.tool_registry.get_tool_lock(tool_call.tool_name)
+        async with (lock or contextlib.nullcontext()):
+            tool_result = await tool.execute_with_result(
+                call_id=tool_call.call_id,
+                **tool_call.arguments
+            )
+        
+        # Format observation
+        if tool_result.status.value == "success":
+            observation = f"Tool '{tool_call.tool_name}' succeeded: {_dumps(tool_result.output)}"
+        else:
+            observation = f"Tool '{tool_call.tool_name}' failed: {tool_result.error}"
+        
+        self.state.observation = observation
+        return tool_call, observation
+    
+    def _compact_history(self, history: List[Dict[str, str]], summary: List[str]) -> None:
+        """
+        Fold the oldest assistant/tool messages into the running summary once
+        the history exceeds the sliding window (modifies both lists in place).
+        """
+        overflow = len(history) - self.max_history_messages
+        if overflow <= 0:
+            return
+        
+        # Drop whole assistant/tool pairs so the window never starts with a tool message
+        overflow += overflow % 2
+        for msg in history[:overflow]:
+            if msg["role"] == "tool":
+                content = msg["content"]
+                if len(content) > self.summary_preview_chars:
+                    content = content[:self.summary_preview_chars] + "..."
+                summary.append(content)
+        del history[:overflow]
+    
+    def _build_messages(
+        self,
+        task: str,
+        context: Optional[List[MCPMessage]] = None
+    ) -> List[Dict[str, str]]:
+        """Build the initial message list (system prompt, task context, task) for a task"""
+        # Initialize context
+        if context is None:
+            context = []
+        
+        # Get current time for context
+        now = datetime.now()
+        current_time = now.strftime("%Y-%m-%d %H:%M:%S")
+        current_date = now.strftime("%Y-%m-%d")
+        
+        # Per-task context with timestamp
+        task_context = _CONTEXT_TEMPLATE.format_map({
+            "current_date": current_date,
+            "current_time": current_time,
+            "workspace": self.workspace_path
+        })
+        
+        # Add system prompt and task. The static system prompt is its own message so
+        # it stays a byte-identical, cacheable prefix across calls (provider prompt caching)
+        messages = [
+            {"role": "system", "content": self.get_system_prompt()},
+            {"role": "system", "content": task_context},
+            {"role": "user", "content": task}
+        ]
+        
+        # Add context messages
+        for msg in context:
+            messages.append({
+                "role": msg.role.value,
+                "content": msg.content
+            })
+        
+        return messages
+    
+    async def execute_task_stream(
+        self,
+        task: str,
+        context: Optional[List[MCPMessage]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Run a single tool-free LLM turn for a task, yielding the response text as
+        it streams in. Callers may stop iterating (and close the generator) as soon
+        as they have what they need; the rest of the response is not generated.
+        """
+        self.state.status = "thinking"
+        self.state.current_task = task
+        
+        messages = self._build_messages(task, context)
+        async for delta in self.llm_client.chat_completion_stream(
+            messages=messages,
+            temperature=0.7
+        ):
+            yield delta
+    
+    async def execute_task_candidates(
+        self,
+        task: str,
+        n: int,
+        context: Optional[List[MCPMessage]] = None
+    ) -> List[str]:
+        """
+        Run a single tool-free LLM turn for a task and return n independently
+        sampled responses (one round trip where the provider supports it)
+        """
+        self.state.status = "thinking"
+        self.state.current_task = task
+        
+        messages = self._build_messages(task, context)
+        return await self.llm_client.chat_completion_candidates(
+            messages=messages,
+            n=n,
+            temperature=0.7
+        )
+    
     async def execute_task(
         self,
         task: str,
@@ -89,43 +280,22 @@ class BaseAgent(ABC):
         self.state.status = "thinking"
         self.state.current_task = task
         
-        # Initialize context
-        if context is None:
-            context = []
-        
-        # Get current time for context
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        
-        # Build system prompt with timestamp
-        system_prompt = self.get_system_prompt()
-        system_prompt_with_time = f"""{system_prompt}
-
-===== CURRENT CONTEXT =====
-Current Date: {current_date}
-Current Time: {current_time}
-Workspace: {self.workspace_path}
-===========================
-
-Remember to use the current date/time information when relevant to your task."""
-        
-        # Add system prompt and task
-        messages = [
-            {"role": "system", "content": system_prompt_with_time},
-            {"role": "user", "content": task}
-        ]
-        
-        # Add context messages
-        for msg in context:
-            messages.append({
-                "role": msg.role.value,
-                "content": msg.content
-            })
+        messages = self._build_messages(task, context)
         
         thoughts = []
         actions = []
         observations = []
         
+        # Tool steps are kept in a sliding window; older steps are compacted into a summary
+        # so each iteration re-sends a bounded prompt instead of the full transcript
+        history: List[Dict[str, str]] = []
+        summary: List[str] = []
+        
+        # Tool set is fixed for the whole task: agent tools plus the special "finish" tool
+        tool_names = self.get_available_tools()
+        tool_definitions = self.tool_registry.get_tool_definitions(tool_names)
+        tool_definitions.append(FINISH_TOOL)
+        
         # ReAct loop
         for iteration in range(self.max_iterations):
             # Check if task was marked as finished
@@ -142,37 +312,19 @@ Remember to use the current date/time information when relevant to your task."""
                 }
             
             try:
-                # Get available tools
-                tool_names = self.get_available_tools()
-                tool_definitions = self.tool_registry.get_tool_definitions(tool_names)
-                
-                # Add the special "finish" tool that agents can call to complete early
-                from src.mcp.protocol import ToolDefinition, ToolParameter
-                finish_tool = ToolDefinition(
-                    name="finish",
-                    description="Call this tool when you have completed the task successfully. This will immediately end the current task and move to the next step.",
-                    parameters=[
-                        ToolParameter(
-                            name="message",
-                            type="string",
-                            description="Final summary message describing what was accomplished",
-                            required=False
-                        )
-                    ],
-                    returns={
-                        "type": "object",
-                        "description": "Confirmation of task completion"
-                    }
-                )
-                
-                # Combine agent tools with finish tool
-                if tool_definitions is None:
-                    tool_definitions = []
-                tool_definitions.append(finish_tool)
+                # Assemble prompt: fixed head, summary of compacted steps, recent window
+                self._compact_history(history, summary)
+                request_messages = list(messages)
+                if summary:
+                    request_messages.append({
+                        "role": "user",
+                        "content": "Summary of earlier tool results:\n" + "\n".join(f"- {line}" for line in summary)
+                    })
+                request_messages.extend(history)
                 
                 # LLM call
                 response = await self.llm_client.chat_completion(
-                    messages=messages,
+                    messages=request_messages,
                     tools=tool_definitions if tool_definitions else None,
                     temperature=0.7
                 )
@@ -185,73 +337,72 @@ Remember to use the current date/time information when relevant to your task."""
                 
                 # Check for tool calls
                 if response["tool_calls"]:
-                    for tool_call_data in response["tool_calls"]:
-                        # Display the tool call
-                        print(f"\n🔧 Tool Call: {tool_call_data['name']}")
-                        print(f"   Arguments: {json.dumps(tool_call_data.get('arguments', {}), indent=2)}")
-                        
-                        # Check if this is a special "finish" call
-                        if tool_call_data["name"] == "finish":
-                            # Agent is signaling completion
-                            self._task_finished = True
-                            self.state.status = "completed"
-                            
-                            # Create finish tool call and add to actions for logging
-                            finish_call = create_tool_call(
-                                tool_name="finish",
-                                arguments=tool_call_data.get("arguments", {}),
-                                agent_id=self.agent_id
-                            )
-                            actions.append(finish_call)
-                            
-                            # Extract final message from arguments if provided
-                            final_message = tool_call_data.get("arguments", {}).get("message", thought)
-                            
-                            return {
-                                "success": True,
-                                "result": final_message or thought or "Task completed",
-                                "thoughts": thoughts,
-                                "actions": actions,
-                                "observations": observations,
-                                "iterations": iteration + 1,
-                                "finished_early": True
-                            }
-                        
-                        # Create tool call
-                        tool_call = create_tool_call(
-                            tool_name=tool_call_data["name"],
-                            arguments=tool_call_data["arguments"],
-                            agent_id=self.agent_id
-                        )
+                    # A "finish" call ends the task; calls listed before it still run,
+                    # calls listed after it are skipped
+                    tool_calls = response["tool_calls"]
+                    finish_index = next(
+                        (i for i, tc in enumerate(tool_calls) if tc["name"] == "finish"), None
+                    )
+                    if finish_index is not None:
+                        tool_calls = tool_calls[:finish_index]
+                    
+                    # Independent tool calls run concurrently; results keep the LLM's order
+                    results = await asyncio.gather(
+                        *(self._run_one_tool(tool_call_data) for tool_call_data in tool_calls),
+                        return_exceptions=True
+                    )
+                    # Record every call that completed (some may have side effects, e.g.
+                    # saved files) before surfacing the first failure
+                    first_error = None
+                    for outcome in results:
+                        if isinstance(outcome, BaseException):
+                            if first_error is None:
+                                first_error = outcome
+                            continue
+                        tool_call, observation = outcome
                         actions.append(tool_call)
-                        self.state.action = tool_call
-                        self.state.status = "acting"
-                        
-                        # Execute tool
-                        tool = self.tool_registry.get_tool(tool_call.tool_name)
-                        tool_result = await tool.execute_with_result(
-                            call_id=tool_call.call_id,
-                            **tool_call.arguments
-                        )
-                        
-                        # Format observation
-                        if tool_result.status.value == "success":
-                            observation = f"Tool '{tool_call.tool_name}' succeeded: {json.dumps(tool_result.output, indent=2)}"
-                        else:
-                            observation = f"Tool '{tool_call.tool_name}' failed: {tool_result.error}"
-                        
                         observations.append(observation)
-                        self.state.observation = observation
                         
-                        # Add to messages for next iteration
-                        messages.append({
+                        # Add to history for next iteration
+                        history.append({
                             "role": "assistant",
                             "content": thought if thought else f"Using tool: {tool_call.tool_name}"
                         })
-                        messages.append({
+                        history.append({
                             "role": "tool",
                             "content": observation
                         })
+                    if first_error is not None:
+                        raise first_error
+                    
+                    if finish_index is not None:
+                        finish_call_data = response["tool_calls"][finish_index]
+                        self._print_tool_call(finish_call_data)
+                        
+                        # Agent is signaling completion
+                        self._task_finished = True
+                        self.state.status = "completed"
+                        
+                        # Create finish tool call and add to actions for logging
+                        finish_call = create_tool_call(
+                            tool_name="finish",
+                            arguments=finish_call_data.get("arguments", {}),
+                            agent_id=self.agent_id
+                        )
+                        actions.append(finish_call)
+                        
+                        # Extract final message from arguments if provided
+                        final_message = finish_call_data.get("arguments", {}).get("message", thought)
+                        
+                        return {
+                            "success": True,
+                            "result": final_message or thought or "Task completed",
+                            "thoughts": thoughts,
+                            "actions": actions,
+                            "observations": observations,
+                            "iterations": iteration + 1,
+                            "finished_early": True
+                        }
                     
                     self.state.status = "thinking"
                     
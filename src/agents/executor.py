@@ -9,12 +9,7 @@ from src.agents.base_agent import BaseAgent
 class ExecutorAgent(BaseAgent):
     """Tactical executor that carries out specific tasks"""
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.agent_type = "executor"
-    
-    def get_system_prompt(self) -> str:
-        return """You are a Tactical Executor for a quantitative finance research team.
+    SYSTEM_PROMPT = """You are a Tactical Executor for a quantitative finance research team.
 
 Your role is to:
 1. Execute a single, specific task given to you
@@ -42,5 +37,14 @@ When you receive a task:
 
 Available tools will be provided in your context. Use them effectively."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.agent_type = "executor"
+        # Tool list is static per agent; resolve it once
+        self._available_tools = self.tool_registry.get_tools_for_agent("executor")
+    
+    def get_system_prompt(self) -> str:
+        return self.SYSTEM_PROMPT
+    
     def get_available_tools(self) -> List[str]:
-        return self.tool_registry.get_tools_for_agent("executor")
+        return self._available_tools
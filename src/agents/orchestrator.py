@@ -2,22 +2,150 @@
 Orchestrator Agent
 Central coordinator managing the entire workflow
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from src.agents.base_agent import BaseAgent
 from src.mcp.protocol import MCPMessage, WorkflowPlan
+from enum import Enum
+import asyncio
+import contextlib
+import hashlib
+import heapq
 import json
-import re
+import logging
+
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to stdlib json
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+# Agents that are valid decisions even without a TASK
+_TERMINAL_AGENTS = frozenset({"planner", "finish"})
+
+# Appended after the unchanged prompt when a decision has to be retried
+_RETRY_SUFFIX = "\n\nYour previous response did not follow the exact format. Reply again with ONLY the three required lines."
+
+
+class _ParseState(Enum):
+    """States of the decision-response parser"""
+    SEEK = "seek"        # looking for a labeled line
+    IN_TASK = "in_task"  # collecting continuation lines of a TASK value
+
+
+def _skip_chars(text: str, pos: int, chars: str) -> int:
+    """Advance pos past any of chars and whitespace"""
+    while pos < len(text) and (text[pos] in chars or text[pos].isspace()):
+        pos += 1
+    return pos
+
+
+def _match_word(text: str, pos: int, word: str) -> int:
+    """Position after word (case-insensitive) if text has it at pos, else -1"""
+    end = pos + len(word)
+    return end if text[pos:end].upper() == word else -1
+
+
+def _classify_line(line: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Classify a stripped response line by its label (optionally bulleted or
+    bolded, case-insensitive, "_"/"-"/space between label words, ":" or "=").
+    
+    Returns:
+        ("NEXT_AGENT" | "PLAN_STEP" | "TASK", value) for a labeled line,
+        ("END", None) for a NEXT_AGENT/PLAN_STEP label without a value,
+        (None, None) for any other line
+    """
+    pos = _skip_chars(line, 0, "-*")
+    label = None
+    for first, second, name in (("NEXT", "AGENT", "NEXT_AGENT"), ("PLAN", "STEP", "PLAN_STEP")):
+        end = _match_word(line, pos, first)
+        if end >= 0:
+            end = _match_word(line, _skip_chars(line, end, "_-"), second)
+        if end >= 0:
+            label, pos = name, end
+            break
+    if label is None:
+        pos = _match_word(line, pos, "TASK")
+        if pos < 0:
+            return None, None
+        label = "TASK"
+    
+    sep = _skip_chars(line, pos, "")
+    if sep < len(line) and line[sep] in ":=":
+        value = line[sep + 1:].strip()
+        if value or label == "TASK":
+            return label, value
+    if label != "TASK" and (pos == len(line) or not (line[pos].isalnum() or line[pos] == "_")):
+        return "END", None
+    return None, None
+
+
+def _plan_step_value(value: str) -> Optional[Any]:
+    """PLAN_STEP value as an int, None for NONE, or the raw text"""
+    if value.upper() == "NONE":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def _parse_exact_decision(response: str) -> Optional[Dict[str, Optional[Any]]]:
+    """
+    Parse the common well-formed reply: exactly the three lines
+    "NEXT_AGENT: ...", "PLAN_STEP: ...", "TASK: ..." in that order.
+    
+    Returns None when the response deviates in any way
+    """
+    lines = response.strip().splitlines()
+    if len(lines) != 3:
+        return None
+    values = []
+    for line, expected in zip(lines, ("NEXT_AGENT", "PLAN_STEP", "TASK")):
+        label, sep, value = line.partition(":")
+        value = value.strip()
+        if not sep or not value or label.strip().upper() != expected:
+            return None
+        values.append(value)
+    return {
+        "next_agent": values[0],
+        "plan_step": _plan_step_value(values[1]),
+        "task": values[2]
+    }
+
+
+def _task_terminated(text: str) -> bool:
+    """
+    True if a labeled line follows the last TASK line in text, so no further
+    continuation lines can belong to the TASK value
+    """
+    seen_task = terminated = False
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        label, _ = _classify_line(line)
+        if label == "TASK":
+            seen_task, terminated = True, False
+        elif label is not None and seen_task:
+            terminated = True
+    return terminated
+
+
+def _dump_plan(plan: WorkflowPlan) -> str:
+    """Serialize a plan as compact, key-sorted JSON for the orchestrator prompt"""
+    data = plan.model_dump(mode="json")
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS).decode()
+    return json.dumps(data, separators=(",", ":"), sort_keys=True)
 
 
 class OrchestratorAgent(BaseAgent):
     """Master/Orchestrator agent coordinating all other agents"""
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.agent_type = "orchestrator"
-    
-    def get_system_prompt(self) -> str:
-        return """You are the Master Orchestrator for a quantitative finance multi-agent research team.
+    SYSTEM_PROMPT = """You are the Master Orchestrator for a quantitative finance multi-agent research team.
 
 Your mission:
 - Interpret the user's request and the design specification context.
@@ -33,17 +161,24 @@ Operational principles:
 5. Direct the Writer only after all prerequisite artifacts exist. The Writer must reference concrete evidence.
 6. Finish the workflow only when every plan requirement is satisfied (or the user explicitly stops) and deliverables are in place.
 
-Formatting rules for every decision:
-NEXT_AGENT: [planner|executor|strategy_refinement|writer|finish]
-PLAN_STEP: [associated plan step number or NONE]
-TASK: [clear, actionable instruction for the chosen agent]
-
 Additional guidance:
 - Reference plan steps explicitly and tailor instructions to the request type.
 - Encourage reuse of existing artifacts instead of redundant work.
 - If evaluation reports indicate a strategy iteration other than v3 is superior, highlight that insight.
 - Provide sufficient context in TASK so the delegated agent can act without further clarification."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.agent_type = "orchestrator"
+        self.max_listed_files = 50  # Workspace files shown per decision prompt
+        self.retry_candidates = 2  # Responses sampled at once when the first decision is malformed
+        # (plan, serialized JSON) for the last plan seen; plans are replaced, not mutated,
+        # so an identity check is enough to reuse the string across turns
+        self._plan_json_cache: Optional[Tuple[WorkflowPlan, str]] = None
+    
+    def get_system_prompt(self) -> str:
+        return self.SYSTEM_PROMPT
+    
     def get_available_tools(self) -> List[str]:
         return ["file_system_scanner"]
     
@@ -58,15 +193,83 @@ Additional guidance:
     ) -> Dict[str, Any]:
         """Decide the next agent and task based on current state"""
         
+        # A new plan is serialized in a worker thread while the file listing is built
+        plan_json_task = None
+        if plan and self._cached_plan_json(plan) is None:
+            plan_json_task = asyncio.create_task(asyncio.to_thread(_dump_plan, plan))
+        
         # Build context
-        file_list = "\n".join([
+        # Only the most recently modified files are listed, in name order, so the
+        # listing changes as little as possible between turns (prompt cache stability)
+        listed_files = sorted(
+            heapq.nlargest(self.max_listed_files, current_files, key=lambda f: f["modified_time"]),
+            key=lambda f: f["name"]
+        )
+        file_list = "\n".join(
             f"- {f['name']} ({f['size_bytes']} bytes, modified: {f['modified_time']})"
-            for f in current_files
-        ])
-        plan_details = json.dumps(plan.dict(), indent=2, default=str, sort_keys=True) if plan else "No plan yet"
+            for f in listed_files
+        )
+        omitted = len(current_files) - len(listed_files)
+        if omitted > 0:
+            file_list += f"\n({omitted} older files not shown)"
+        if logger.isEnabledFor(logging.DEBUG):
+            # A changed hash means the prompt prefix up to the file listing changed
+            logger.debug(
+                f"Orchestrator file listing: {len(listed_files)} files, "
+                f"hash {hashlib.md5(file_list.encode()).hexdigest()[:8]}"
+            )
+        if plan_json_task is not None:
+            plan_details = await plan_json_task
+            self._plan_json_cache = (plan, plan_details)
+        else:
+            plan_details = self._cached_plan_json(plan) if plan else "No plan yet"
         files_section = file_list if file_list else "(No files in workspace yet)"
         
-        base_prompt = f"""User Request: {user_request}
+        base_prompt = self._build_prompt(
+            user_request, state_summary, recent_action, plan_progress, plan_details, files_section
+        )
+        return await self._request_decision(base_prompt)
+    
+    async def _request_decision(self, base_prompt: str) -> Dict[str, Any]:
+        """Ask the LLM for a decision, retrying when the response is malformed"""
+        # First attempt is streamed; if it is malformed, the retries are sampled
+        # as parallel candidates in one round trip instead of one call after another
+        first_response = await self._stream_decision(base_prompt)
+        decision = self._accept_decision(first_response)
+        if decision:
+            return decision
+        
+        candidates = await self._sample_decisions(base_prompt + _RETRY_SUFFIX)
+        for response in candidates:
+            decision = self._accept_decision(response)
+            if decision:
+                return decision
+        
+        last_response = candidates[-1] if candidates else first_response
+        raise ValueError(
+            f"Orchestrator failed to provide a valid NEXT_AGENT after {1 + len(candidates)} attempts. Last response: {last_response}"
+        )
+    
+    def _build_prompt(
+        self,
+        user_request: str,
+        state_summary: str,
+        recent_action: str,
+        plan_progress: str,
+        plan_details: str,
+        files_section: str
+    ) -> str:
+        """Decision prompt for the given state"""
+        # Static instructions first and per-turn state last, so consecutive turns
+        # (and the retries below) share the longest possible prompt prefix.
+        # This header is the single source of the response format.
+        static_header = """Determine the next agent to invoke and provide a precise task.
+Respond ONLY with three lines in this exact format (no additional text before or after):
+NEXT_AGENT: <planner|executor|strategy_refinement|writer|finish>
+PLAN_STEP: <plan step number or NONE>
+TASK: <clear, actionable instruction for the chosen agent>"""
+        
+        dynamic_tail = f"""User Request: {user_request}
 
 Workflow State:
 {state_summary}
@@ -81,78 +284,95 @@ Plan Details (JSON):
 {plan_details}
 
 Files in Workspace:
-{files_section}
-
-Determine the next agent to invoke and provide a precise task.
-Respond ONLY with three lines in this exact format (no additional text before or after):
-NEXT_AGENT: <planner|executor|strategy_refinement|writer|finish>
-PLAN_STEP: <plan step number or NONE>
-TASK: <clear, actionable instruction for the chosen agent>"""
-
-        attempts = 0
-        last_response = ""
-        while attempts < 3:
-            prompt = base_prompt if attempts == 0 else (
-                base_prompt +
-                "\n\nYour previous response did not follow the exact format. Reply again with ONLY the three required lines."
-            )
-            result = await self.execute_task(prompt)
-            response = result.get("result", "") if isinstance(result, dict) else str(result)
-            parsed = self._parse_decision_response(response)
-            next_agent = parsed["next_agent"]
-            task_description = parsed["task"]
-            plan_step = parsed["plan_step"]
-            if next_agent and (next_agent.lower() in {"planner", "finish"} or task_description):
-                return {
-                    "next_agent": next_agent,
-                    "task": task_description,
-                    "plan_step": plan_step,
-                    "reasoning": response
-                }
-            last_response = response
-            attempts += 1
-        raise ValueError(
-            f"Orchestrator failed to provide a valid NEXT_AGENT after {attempts} attempts. Last response: {last_response}"
-        )
-
+{files_section}"""
+        
+        return static_header + "\n\n---\n\n" + dynamic_tail
+    
+    def _accept_decision(self, response: str) -> Optional[Dict[str, Any]]:
+        """Parse a decision response, returning None if it is not a usable decision"""
+        parsed = self._parse_decision_response(response)
+        next_agent = parsed["next_agent"]
+        task_description = parsed["task"]
+        if next_agent and (task_description or next_agent.lower() in _TERMINAL_AGENTS):
+            return {
+                "next_agent": next_agent,
+                "task": task_description,
+                "plan_step": parsed["plan_step"],
+                "reasoning": response
+            }
+        return None
+    
+    async def _sample_decisions(self, prompt: str) -> List[str]:
+        """Sample retry_candidates decision responses in a single round trip"""
+        try:
+            return await self.execute_task_candidates(prompt, n=self.retry_candidates)
+        except Exception:
+            logger.warning("Orchestrator retry sampling failed", exc_info=True)
+            return []
+    
+    async def _stream_decision(self, prompt: str) -> str:
+        """
+        Stream a decision response and stop reading once it is complete, i.e.
+        NEXT_AGENT and TASK are known and a labeled line follows the TASK (a TASK
+        may wrap onto continuation lines, so otherwise the stream is read to the
+        end). Returns "" if the LLM call fails, which the caller treats as a
+        malformed response and retries.
+        """
+        chunks: List[str] = []
+        try:
+            async with contextlib.aclosing(self.execute_task_stream(prompt)) as stream:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    if "\n" not in chunk:
+                        continue
+                    text = "".join(chunks)
+                    complete = text[:text.rindex("\n")]
+                    if not _task_terminated(complete):
+                        continue
+                    parsed = self._parse_decision_response(complete)
+                    if parsed["next_agent"] and parsed["task"]:
+                        return complete
+        except Exception:
+            logger.warning("Orchestrator decision call failed", exc_info=True)
+            return ""
+        return "".join(chunks)
+    
+    def _cached_plan_json(self, plan: WorkflowPlan) -> Optional[str]:
+        """Serialized plan if the workflow still has the plan object last serialized"""
+        if self._plan_json_cache is None or self._plan_json_cache[0] is not plan:
+            return None
+        return self._plan_json_cache[1]
+    
     def _parse_decision_response(self, response: str) -> Dict[str, Optional[Any]]:
+        fast = _parse_exact_decision(response)
+        if fast is not None:
+            return fast
+        
         next_agent: Optional[str] = None
         plan_step: Optional[Any] = None
         task_lines: List[str] = []
-        collecting_task = False
+        state = _ParseState.SEEK
         for raw_line in response.splitlines():
             line = raw_line.strip()
             if not line:
                 continue
-            match_agent = re.match(r"[-*\s]*NEXT[_\s-]*AGENT\s*[:=]\s*(.+)", line, re.IGNORECASE)
-            if match_agent:
-                next_agent = match_agent.group(1).strip()
-                collecting_task = False
-                continue
-            match_plan = re.match(r"[-*\s]*PLAN[_\s-]*STEP\s*[:=]\s*(.+)", line, re.IGNORECASE)
-            if match_plan:
-                value = match_plan.group(1).strip()
-                if value.upper() == "NONE":
-                    plan_step = None
+            label, value = _classify_line(line)
+            if label == "NEXT_AGENT":
+                next_agent = value
+                state = _ParseState.SEEK
+            elif label == "PLAN_STEP":
+                plan_step = _plan_step_value(value)
+                state = _ParseState.SEEK
+            elif label == "TASK":
+                task_lines = [value] if value else []
+                state = _ParseState.IN_TASK
+            elif state is _ParseState.IN_TASK:
+                if label == "END":
+                    state = _ParseState.SEEK
                 else:
-                    try:
-                        plan_step = int(value)
-                    except ValueError:
-                        plan_step = value
-                collecting_task = False
-                continue
-            match_task = re.match(r"[-*\s]*TASK\s*[:=]\s*(.*)", line, re.IGNORECASE)
-            if match_task:
-                first_fragment = match_task.group(1).strip()
-                task_lines = [first_fragment] if first_fragment else []
-                collecting_task = True
-                continue
-            if collecting_task:
-                if re.match(r"[-*\s]*(NEXT[_\s-]*AGENT|PLAN[_\s-]*STEP)\b", line, re.IGNORECASE):
-                    collecting_task = False
-                    continue
-                task_lines.append(line)
-        task_description = "\n".join([fragment for fragment in task_lines if fragment]).strip() if task_lines else None
+                    task_lines.append(line)
+        # Fragments are never empty: blank lines are skipped and an empty TASK value isn't stored
+        task_description = "\n".join(task_lines).strip() or None
         return {
             "next_agent": next_agent,
             "plan_step": plan_step,
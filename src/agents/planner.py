@@ -2,17 +2,331 @@
 Planner Agent
 Creates detailed, executable plans from user requests
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, FrozenSet, Mapping, Tuple
 from src.agents.base_agent import BaseAgent
 from src.mcp.protocol import WorkflowPlan
+import functools
 import json
+import logging
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta, date
 import re
+import time
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
 
 
 STRATEGY_INTERFACE_SNIPPET = """```python\nfrom abc import ABC, abstractmethod\nfrom typing import Dict, List, Optional, Any\nfrom dataclasses import dataclass\nfrom datetime import datetime\n\n@dataclass\nclass MarketData:\n    timestamp: datetime\n    symbol: str\n    open: float\n    high: float\n    low: float\n    close: float\n    volume: int\n    additional_data: Optional[Dict[str, Any]] = None\n\n@dataclass\nclass Signal:\n    symbol: str\n    signal_type: str  # 'BUY', 'SELL', 'HOLD'\n    quantity: Optional[float] = None\n    price: Optional[float] = None\n    confidence: float = 1.0\n    metadata: Optional[Dict[str, Any]] = None\n\n@dataclass\nclass StrategyConfig:\n    name: str\n    parameters: Dict[str, Any]\n    symbols: List[str]\n    risk_limits: Dict[str, float]\n    execution_params: Dict[str, Any]\n\nclass TradingStrategy(ABC):\n    def __init__(self, config: StrategyConfig):\n        self.config = config\n        self.initialized = False\n        self.performance_metrics = {}\n\n    @abstractmethod\n    def initialize(self, **kwargs) -> None:\n        pass\n\n    @abstractmethod\n    def generate_signals(self, market_data: Dict[str, MarketData]) -> List[Signal]:\n        pass\n\n    @abstractmethod\n    def on_market_data(self, data: MarketData) -> Optional[Signal]:\n        pass\n\n    @abstractmethod\n    def backtest(self, historical_data) -> Dict[str, Any]:\n        pass\n\n    def update_parameters(self, parameters: Dict[str, Any]) -> None:\n        self.config.parameters.update(parameters)\n\n    def get_performance_metrics(self) -> Dict[str, Any]:\n        return self.performance_metrics\n\n    def validate_config(self) -> bool:\n        required_fields = ['name', 'symbols']\n        return all(field in self.config.__dict__ for field in required_fields)\n```"""
 
 
+# create_plan task text around the user request
+_PLANNER_TASK_PREFIX = """Create a detailed, comprehensive plan for the following request:
+
+"""
+
+_PLANNER_TASK_SUFFIX = """
+
+MINDSET: Keep a growing mindset and be curious to the external information:
+- Make sure *web_search* and *file_saver* are used in the first step for discovery.
+- After complete each step, immediately save findings into a workspace artifact (e.g., `step1_findings.md`).
+
+CRITICAL: Each step must be SELF-CONTAINED and COMPREHENSIVE:
+- Objective: Include specific parameters, ticker symbols, time periods, strategy details, and explicitly note trading cost + settlement assumptions (T+0 or T+1)
+- Inputs: List exact files, data formats, columns, parameters needed, and emphasize that Python execution must use only existing downloaded datasets (no yfinance or live APIs)
+- Outputs: Specify exact file names, formats, contents, metrics, visualizations, and how artifacts feed into downstream markdown reporting
+- Outputs: Incorporate versioned filenames (e.g., *_v1, *_v2) when multiple iterations are expected within the same session so earlier artifacts remain available
+- Success Criteria: Define clear completion indicators tied to measurable checks (file existence, metric ranges, research coverage)
+- Adapt the number of steps to the request's scope while respecting module expectations (research discovery, data understanding, strategy design/backtest, evaluation, reporting)
+
+ADDITIONAL DIRECTIVES:
+- The plan MUST start with an in-depth online/document research step that leverages `web_search` (and other discovery tools if relevant) to capture background, real-time sentiment, macroeconomic context, and regulatory factors related to the trading target. Require saving findings into a workspace artifact (e.g., `research_notes.md`).
+- For every backtesting or analytics step, specify trading cost assumptions (e.g., 5 bps per trade) and settlement timing (clarify if orders execute same-day close [T+0] or next-day open [T+1]) and ensure outputs include cost-adjusted metrics.
+- When instructing Python execution, explicitly state in the inputs: "Use only the existing downloaded dataset(s) in the workspace; external market data APIs are prohibited."
+- Strategy implementation and the initial backtest must occur in a single step; require the generated code to integrate signal generation and evaluation using the `TradingStrategy` interface from `src/tools/strategy.py`.
+- When invoking `python_execution` for the combined implementation/backtest step, instruct the agent to produce scripts/classes compatible with that interface (e.g., subclassing `TradingStrategy` and executing its `backtest` method) so downstream tooling can reuse the artifact.
+- Embed the following interface snippet verbatim inside that step's "inputs" so the executor has direct access without referencing repository files:
+- Final deliverable must be `final_report.md` that embeds narrative text, displays generated charts via `<img>` tags, and links to supporting CSV/JSON artifacts.
+- For report writing and summarization tasks, invoke `file_saver` (optionally preceded by `find_in_file`) instead of `python_execution`.
+- Strategy refinement cycles should be consolidated into a single step that references all iterations and compares versions after accounting for costs and settlement assumptions.
+- Ensure an inspection task (using `python_execution` or `find_in_file`) captures file structure, schema, column types, missing value handling, and relevant metadata (e.g., `data_structure_notes_v1.md`) before any transformations begin; cite this artifact in later steps.
+
+MODULE GUIDANCE (flexible, do not rigidly template):
+- Research discovery and note: typically 2-3 step using web_search and file_saver tools.
+- Data understanding & preparation: usually 1-2 steps depending on complexity and number of datasets.
+- Strategy implementation & backtest: a single step that builds the strategy code and runs the initial cost-adjusted evaluation.
+- Reporting & handoff: 1 step producing the markdown deliverable with embedded visuals and data links.
+
+Ensure the resulting JSON array follows the specified schema and that each step is fully self-contained."""
+
+
+_DECODER = json.JSONDecoder()
+
+
+def _decode_steps(response: str, start: int) -> Any:
+    """Decode the JSON array that begins at response[start], in one scan that stops where it ends"""
+    steps, _ = _DECODER.raw_decode(response, start)
+    return steps
+
+
+_TICKER_RE = re.compile(r"\b[A-Z]{2,5}\b")
+_INDICATOR_RE = re.compile(r"(\d+[- ]?(day|period)[- ]?(MA|EMA|SMA))", re.IGNORECASE)
+
+_HYPOTHESIS_KEYWORDS = ("hypothesis", "test", "significance", "statistical", "p-value")
+_EDA_KEYWORDS = ("explore", "eda", "visual", "dashboard", "pattern", "insight", "analysis")
+_STRATEGY_KEYWORDS = ("strategy", "trading", "momentum", "mean reversion", "alpha", "portfolio", "backtest")
+
+# One alternation per request type, checked in priority order; each search is a
+# single pass over the request instead of one substring scan per keyword
+_REQUEST_TYPE_PATTERNS = tuple(
+    (request_type, re.compile("|".join(map(re.escape, keywords))))
+    for request_type, keywords in (
+        ("hypothesis", _HYPOTHESIS_KEYWORDS),
+        ("eda", _EDA_KEYWORDS),
+        ("strategy", _STRATEGY_KEYWORDS)
+    )
+)
+
+_STRATEGY_DESCRIPTORS = (
+    ("momentum", "momentum"),
+    ("mean reversion", "mean reversion"),
+    ("pairs", "pairs trading"),
+    ("volatility", "volatility-based"),
+    ("trend", "trend-following")
+)
+
+
+# The extractors below are pure functions of the request text, so results are memoized.
+# Keyword lookups take the lowercased request, computed once by the caller.
+
+@functools.lru_cache(maxsize=256)
+def _determine_request_type(lowered: str) -> str:
+    for request_type, pattern in _REQUEST_TYPE_PATTERNS:
+        if pattern.search(lowered):
+            return request_type
+    return "strategy"
+
+
+@functools.lru_cache(maxsize=256)
+def _extract_ticker(user_request: str) -> str:
+    match = _TICKER_RE.search(user_request)
+    return match.group(0) if match else "SYMBOL"
+
+
+@functools.lru_cache(maxsize=256)
+def _extract_indicator(user_request: str) -> str:
+    indicator_match = _INDICATOR_RE.search(user_request)
+    if indicator_match:
+        return indicator_match.group(1).replace(" ", "-")
+    return "20-day moving average"
+
+
+@functools.lru_cache(maxsize=256)
+def _extract_strategy_descriptor(lowered: str) -> str:
+    for phrase, descriptor in _STRATEGY_DESCRIPTORS:
+        if phrase in lowered:
+            return descriptor
+    return "quantitative"
+
+
+# Tool and artifact names shared across the default plans
+_TOOL_WEB_SEARCH = "web_search"
+_TOOL_FILE_SAVER = "file_saver"
+_TOOL_PYTHON_EXECUTION = "python_execution"
+_TOOL_FIND_IN_FILE = "find_in_file"
+_TOOL_STRATEGY_EVALUATION = "regression_based_strategy_evaluation"
+
+_ARTIFACT_RESEARCH_NOTES = "research_notes.md"
+_ARTIFACT_SUMMARY_STATISTICS = "summary_statistics.csv"
+_ARTIFACT_DATA_QUALITY_REPORT = "data_quality_report.txt"
+_ARTIFACT_FINAL_REPORT = "final_report.md"
+
+# Default plans used when the LLM response cannot be parsed. "{name}" placeholders
+# are filled per request by _render_plan.
+
+# Read-only template step plus the names of its fields that contain placeholders
+_PlanTemplate = Tuple[Tuple[Mapping[str, Any], FrozenSet[str]], ...]
+
+
+def _freeze_plan_template(steps: Tuple[Dict[str, Any], ...]) -> _PlanTemplate:
+    """Freeze template steps, noting which string fields need formatting per request"""
+    return tuple(
+        (
+            MappingProxyType(step),
+            frozenset(key for key, value in step.items() if isinstance(value, str) and "{" in value)
+        )
+        for step in steps
+    )
+
+
+_STRATEGY_PLAN_TEMPLATE = _freeze_plan_template((
+    {
+        "step_number": 1,
+        "objective": "Conduct deep-dive online research capturing macroeconomic backdrop, sector catalysts, market sentiment, and regulatory considerations relevant to {ticker} {strategy_descriptor} strategy design, saving grounded findings for later reference",
+        "required_tools": (_TOOL_WEB_SEARCH, _TOOL_FILE_SAVER),
+        "inputs": "Minimum 5 up-to-date sources (within last 12 months where possible) covering macro trends, sector performance, institutional sentiment, and policy news impacting the target tickers; include search variations for market outlook, analyst commentary, and risk factors",
+        "outputs": "{research_notes_filename} summarizing key insights with citations, bullet list of market drivers, sentiment snapshot, macro themes, and regulatory notes; appended source URL list",
+        "success_criteria": "{research_notes_filename} exists with sections for Macroeconomics, Market Sentiment, Sector Drivers, Risks, Opportunities; cites ≥5 distinct credible sources with access dates"
+    },
+    {
+        "step_number": 2,
+        "objective": "Inventory and validate existing workspace datasets covering {ticker} from {start_date} to {end_date} at {interval} intervals, then engineer {indicator} features while documenting data quality findings",
+        "required_tools": (_TOOL_PYTHON_EXECUTION, _TOOL_FILE_SAVER),
+        "inputs": "Use only CSV files already present in workspace (e.g., workspaces/.../*.csv); task description must state 'Use only existing downloaded dataset(s); do NOT call yfinance or other live APIs'; indicator window=20 days; trading days target={trading_days_estimate}",
+        "outputs": "{data_inventory_filename} listing located datasets with date ranges/columns, {processed_filename} containing cleaned OHLCV data plus {indicator} column, {stats_filename} with descriptive stats, {quality_report_filename} recording missing data handling and assumptions",
+        "success_criteria": "{processed_filename} retains ≥{min_rows} rows, {indicator} populated without NaNs, {quality_report_filename} confirms no live API calls and documents any imputations"
+    },
+    {
+        "step_number": 3,
+        "objective": "Build and backtest the initial {strategy_descriptor} strategy in one pass using the `TradingStrategy` interface, combining signal generation, execution frictions (5 bps per leg), and settlement handling (T+1 base with T+0 sensitivity)",
+        "required_tools": (_TOOL_PYTHON_EXECUTION, _TOOL_FILE_SAVER),
+        "inputs": (
+            "Dataset: {processed_filename}; implement a class that subclasses `TradingStrategy` in src/tools/strategy.py, encapsulating {indicator}-driven logic, cost handling (5 bps), and settlement toggle; include helper to run `backtest` for T+1 baseline and T+0 sensitivity; "
+            "execution instructions must reiterate the offline data constraint and direct the script to persist metrics and plots in workspace.\n"
+            "Copy this strategy interface snippet verbatim before coding so the environment has the full definition:\n\n"
+            "{strategy_interface}"
+        ),
+        "outputs": (
+            "strategy_v1.py defining the TradingStrategy-compliant class and invoking its backtest routine, "
+            "{strategy_results_filename} with scenario-labelled returns, results_v1.json capturing key cost-adjusted metrics, {metrics_filename} summarizing CAGR/Sharpe/Sortino/Max Drawdown/Win Rate for each settlement assumption, "
+            "{equity_curve_filename} overlaying strategy vs benchmark, and execution log saved as evaluation_v1.md summarizing methodological notes"
+        ),
+        "success_criteria": (
+            "strategy_v1.py instantiates a TradingStrategy subclass with initialize/generate_signals/backtest methods, runs without external data calls, and produces cost-adjusted artifacts for both T+1 and T+0 scenarios"
+        )
+    },
+    {
+        "step_number": 4,
+        "objective": "Synthesize evaluator and judger feedback to iterate on the {strategy_descriptor} logic (strategy_v1 → strategy_v2 → strategy_v3 if needed), ensuring each revision quantifies improvements net of trading costs and settlement effects",
+        "required_tools": (_TOOL_PYTHON_EXECUTION, _TOOL_FILE_SAVER, _TOOL_STRATEGY_EVALUATION, _TOOL_FIND_IN_FILE),
+        "inputs": "Artifacts: strategy_v1.py, {strategy_results_filename}, results_v1.json, {processed_filename}, evaluation_v1.md, feedback files, cost assumptions (5 bps), settlement options (T+1 base, T+0 sensitivity); reiterate offline data constraint in execution instructions",
+        "outputs": "If improvements are attempted, produce strategy_v2.py/results_v2.json/evaluation_v2.md/feedback_v2.txt (and strategy_v3.py/... as needed) plus {comparison_filename} compiling key metrics across versions and settlement scenarios",
+        "success_criteria": "Each iteration documents changes, produces cost-adjusted metrics matching the TradingStrategy interface outputs, and {comparison_filename} highlights the best-performing version with settlement context"
+    },
+    {
+        "step_number": 5,
+        "objective": "Generate markdown deliverable summarizing research context, data preparation, strategy iterations, and performance comparisons with embedded visuals and links to supporting artifacts",
+        "required_tools": (_TOOL_FIND_IN_FILE, _TOOL_FILE_SAVER),
+        "inputs": "Inputs: {research_notes_filename}, {processed_filename}, {metrics_filename}, {equity_curve_filename}, {comparison_filename}, evaluation and feedback docs; ensure markdown references local images and links to CSV/JSON files",
+        "outputs": "{markdown_report_filename} containing narrative sections (Executive Summary, Market Context, Data Preparation, Strategy Results, Risk Considerations, Next Steps), embedded image for {equity_curve_filename}, hyperlinks to datasets and metrics files",
+        "success_criteria": "{markdown_report_filename} exists, renders embedded chart and working hyperlinks, explicitly states recommended strategy version and settlement assumption based on cost-adjusted metrics"
+    }
+))
+
+_EDA_PLAN_TEMPLATE = _freeze_plan_template((
+    {
+        "step_number": 1,
+        "objective": "Compile comprehensive background research for {ticker} covering macro environment, sector performance, sentiment, and recent news to contextualize exploratory data analysis",
+        "required_tools": (_TOOL_WEB_SEARCH, _TOOL_FILE_SAVER),
+        "inputs": "At least 5 reputable, recent sources spanning macro trends, sector commentary, analyst views, and risk factors; include varied queries targeting sentiment and regulatory considerations",
+        "outputs": "{research_notes_filename} summarizing macro factors, sentiment indicators, sector drivers, and risks/opportunities with cited URLs",
+        "success_criteria": "{research_notes_filename} contains dedicated sections for Macro, Sector, Sentiment, Risks, cites ≥5 sources, and notes data relevance timeframe"
+    },
+    {
+        "step_number": 2,
+        "objective": "Identify and cleanse existing workspace datasets for {ticker} ({start_date} to {end_date}, interval {interval}), recording data quality decisions while engineering {indicator}",
+        "required_tools": (_TOOL_PYTHON_EXECUTION, _TOOL_FILE_SAVER),
+        "inputs": "Use only pre-downloaded CSVs within workspace (e.g., workspaces/.../*.csv); task description must forbid live API usage; cleaning rules: forward-fill gaps ≤3 days, drop rows missing Close; indicator window=20",
+        "outputs": "{cleaned_filename} with OHLCV plus {indicator}, {stats_filename} capturing descriptive statistics, {quality_report_filename} documenting located files, coverage, missing data handling, and confirmation of no external downloads",
+        "success_criteria": "{cleaned_filename} retains ≥{min_rows} observations, {indicator} contains no NaNs, {quality_report_filename} explicitly confirms offline-only data usage"
+    },
+    {
+        "step_number": 3,
+        "objective": "Compute exploratory analytics (returns distribution, rolling volatility, volume dynamics, correlations) on {cleaned_filename} to uncover structural patterns",
+        "required_tools": (_TOOL_PYTHON_EXECUTION, _TOOL_FILE_SAVER),
+        "inputs": "Dataset: {cleaned_filename}; metrics: daily returns, rolling 20-day volatility, autocorrelation lags (1,5,20), volume z-scores, correlation matrix between price changes, volume, {indicator}; execution instructions must restate offline data constraint",
+        "outputs": "{eda_metrics_filename} containing computed metrics and correlation matrices, {metrics_summary_filename} describing notable patterns and anomalies",
+        "success_criteria": "All computed metrics stored without NaNs, {metrics_summary_filename} highlights ≥3 insights referencing quantitative evidence"
+    },
+    {
+        "step_number": 4,
+        "objective": "Produce visualization set showcasing price vs {indicator}, returns distribution, rolling volatility, and volume behavior to support qualitative assessment",
+        "required_tools": (_TOOL_PYTHON_EXECUTION, _TOOL_FILE_SAVER),
+        "inputs": "Source data: {cleaned_filename}; charts: price+{indicator} line, returns histogram, rolling volatility line, volume bar with z-score overlay; reiterate offline data constraint in task description",
+        "outputs": "PNG files {visualization_prefix}_trend.png, {visualization_prefix}_returns_hist.png, {visualization_prefix}_volatility.png, {visualization_prefix}_volume.png with labeled axes and legends",
+        "success_criteria": "All PNGs generated successfully, visually clear with titles, stored paths logged"
+    },
+    {
+        "step_number": 5,
+        "objective": "Assemble markdown summary communicating research context, data quality decisions, key EDA findings, and visual evidence with linked artifacts for follow-up investigations",
+        "required_tools": (_TOOL_FIND_IN_FILE, _TOOL_FILE_SAVER),
+        "inputs": "Inputs: {research_notes_filename}, {stats_filename}, {quality_report_filename}, {eda_metrics_filename}, {metrics_summary_filename}, visualization PNGs; ensure Markdown embeds images via ![image](<img>) and links to CSV/JSON resources",
+        "outputs": "{markdown_report_filename} containing sections (Context, Data Audit, Exploratory Metrics, Visual Insights, Recommendations) with embedded charts and hyperlinks to supporting files",
+        "success_criteria": "{markdown_report_filename} exists, renders embedded images, links resolve to workspace files, includes actionable recommendations aligned with findings"
+    }
+))
+
+_HYPOTHESIS_PLAN_TEMPLATE = _freeze_plan_template((
+    {
+        "step_number": 1,
+        "objective": "Gather comprehensive background research for {ticker} focusing on macro trends, sector dynamics, sentiment, and regulatory factors that could influence {strategy_descriptor} hypotheses",
+        "required_tools": (_TOOL_WEB_SEARCH, _TOOL_FILE_SAVER),
+        "inputs": "Use ≥5 recent authoritative sources covering macro, sentiment, industry outlook, and risk considerations; include varied queries encompassing hypothesis topic",
+        "outputs": "{research_notes_filename} detailing contextual insights with citations supporting hypothesis framing",
+        "success_criteria": "{research_notes_filename} includes sections for Macro Context, Sentiment, Sector Drivers, Regulatory/Risk Notes, with ≥5 cited sources"
+    },
+    {
+        "step_number": 2,
+        "objective": "Assemble feature-ready dataset for hypothesis testing using only existing workspace CSVs spanning {start_date} to {end_date} at {interval} intervals, documenting data quality decisions",
+        "required_tools": (_TOOL_PYTHON_EXECUTION, _TOOL_FILE_SAVER),
+        "inputs": "Task description must state: 'Use only downloaded dataset(s); no live API access permitted'; engineering requirements: daily returns, 20-day and 50-day moving averages, rolling 20-day volatility, volume z-scores",
+        "outputs": "{prepared_filename} with engineered features, {quality_report_filename} summarizing source files, coverage, missing data handling, and confirmation of offline-only approach",
+        "success_criteria": "{prepared_filename} retains ≥{min_rows} rows with no missing feature values, {quality_report_filename} records data lineage and quality checks"
+    },
+    {
+        "step_number": 3,
+        "objective": "Formulate statistical hypotheses, select appropriate tests, and document methodology including treatment of trading frictions where relevant",
+        "required_tools": (_TOOL_FIND_IN_FILE, _TOOL_FILE_SAVER),
+        "inputs": "Context from {research_notes_filename}, dataset summary from {quality_report_filename}, significance level α=0.05, note any trading cost or settlement assumptions influencing expected effects",
+        "outputs": "{hypothesis_doc} outlining null/alternative hypotheses, test selection (e.g., t-test, Mann-Whitney, variance ratio), assumptions, and evaluation criteria",
+        "success_criteria": "{hypothesis_doc} includes hypothesis statements, statistical test plan, assumptions validation checklist, and links back to contextual research"
+    },
+    {
+        "step_number": 4,
+        "objective": "Execute planned statistical tests, compute effect sizes, and visualize diagnostics while ensuring reproducibility under offline data constraints",
+        "required_tools": (_TOOL_PYTHON_EXECUTION, _TOOL_FILE_SAVER),
+        "inputs": "Dataset: {prepared_filename}, Plan: {hypothesis_doc}; tests to include mean return t-test, volatility comparison, distribution shift analysis; reiterate offline-only data rule in task description",
+        "outputs": "{test_results_filename} capturing statistics, p-values, confidence intervals, effect sizes; {visualization_filename} summarizing diagnostic plots (QQ plots, rolling stats)",
+        "success_criteria": "{test_results_filename} lists all tests with interpretation fields populated, {visualization_filename} generated without errors, execution logs confirm no live data calls"
+    },
+    {
+        "step_number": 5,
+        "objective": "Synthesize conclusions in interactive markdown summarizing hypothesis outcomes, practical implications, limitations, and recommended next experiments",
+        "required_tools": (_TOOL_FIND_IN_FILE, _TOOL_FILE_SAVER),
+        "inputs": "Inputs: {research_notes_filename}, {hypothesis_doc}, {test_results_filename}, {visualization_filename}; Markdown must embed diagnostics via ![image](<img>) and link to dataset/features/notes",
+        "outputs": "{conclusion_filename} with sections (Context, Hypotheses, Results, Practical Interpretation, Limitations, Next Steps) including embedded diagnostics and hyperlinks",
+        "success_criteria": "{conclusion_filename} exists, renders embedded visualization, references key statistics, and clearly states accept/reject decisions for each hypothesis"
+    }
+))
+
+
+def _render_plan(template: _PlanTemplate, ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Fill a default-plan template, sharing invariant strings and giving each step its own required_tools list"""
+    return [
+        {
+            key: value.format_map(ctx) if key in templated else list(value) if isinstance(value, tuple) else value
+            for key, value in step.items()
+        }
+        for step, templated in template
+    ]
+
+@dataclass(slots=True, frozen=True)
+class _PlanCtx:
+    """Request details a default plan is built from"""
+    ticker: str
+    strategy_descriptor: str
+    indicator: str
+    start_date: date
+    end_date: date
+    interval: str
+    trading_days_estimate: int
+
+
+def _plan_fields(plan_ctx: _PlanCtx) -> Dict[str, Any]:
+    """Template placeholders taken directly from the plan context"""
+    return {field.name: getattr(plan_ctx, field.name) for field in fields(plan_ctx)}
+
+
 class PlannerAgent(BaseAgent):
     """Strategic planner that decomposes user requests into actionable plans"""
     
@@ -20,13 +334,19 @@ class PlannerAgent(BaseAgent):
         super().__init__(*args, **kwargs)
         self.agent_type = "planner"
     
+    @functools.cached_property
+    def system_prompt(self) -> str:
+        """Rendered on first use; tools are fixed once the registry is initialized"""
+        return self._render_system_prompt(self.tool_registry.get_descriptions("executor"))
+    
     def get_system_prompt(self) -> str:
-        available_tools = self.tool_registry.get_tools_for_agent("executor")
-        tools_desc = "\n".join([
-            f"- {tool}: {self.tool_registry.get_tool(tool).get_definition().description}"
-            for tool in available_tools
-        ])
-
+        return self.system_prompt
+    
+    def invalidate_system_prompt(self):
+        """Drop the rendered prompt so the next call re-reads the tool registry"""
+        self.__dict__.pop("system_prompt", None)
+    
+    def _render_system_prompt(self, tools_desc: str) -> str:
         return f"""You are an expert Quantitative Strategist and Project Planner.
 
 Your role is to create detailed, step-by-step plans to address quantitative finance research requests.
@@ -122,41 +442,9 @@ Think step-by-step using Chain-of-Thought reasoning before finalizing the plan.
     async def create_plan(self, user_request: str) -> WorkflowPlan:
         """Create a detailed plan from user request"""
         
-        task = f"""Create a detailed, comprehensive plan for the following request:
-
-{user_request}
-
-MINDSET: Keep a growing mindset and be curious to the external information:
-- Make sure *web_search* and *file_saver* are used in the first step for discovery.
-- After complete each step, immediately save findings into a workspace artifact (e.g., `step1_findings.md`).
-
-CRITICAL: Each step must be SELF-CONTAINED and COMPREHENSIVE:
-- Objective: Include specific parameters, ticker symbols, time periods, strategy details, and explicitly note trading cost + settlement assumptions (T+0 or T+1)
-- Inputs: List exact files, data formats, columns, parameters needed, and emphasize that Python execution must use only existing downloaded datasets (no yfinance or live APIs)
-- Outputs: Specify exact file names, formats, contents, metrics, visualizations, and how artifacts feed into downstream markdown reporting
-- Outputs: Incorporate versioned filenames (e.g., *_v1, *_v2) when multiple iterations are expected within the same session so earlier artifacts remain available
-- Success Criteria: Define clear completion indicators tied to measurable checks (file existence, metric ranges, research coverage)
-- Adapt the number of steps to the request's scope while respecting module expectations (research discovery, data understanding, strategy design/backtest, evaluation, reporting)
-
-ADDITIONAL DIRECTIVES:
-- The plan MUST start with an in-depth online/document research step that leverages `web_search` (and other discovery tools if relevant) to capture background, real-time sentiment, macroeconomic context, and regulatory factors related to the trading target. Require saving findings into a workspace artifact (e.g., `research_notes.md`).
-- For every backtesting or analytics step, specify trading cost assumptions (e.g., 5 bps per trade) and settlement timing (clarify if orders execute same-day close [T+0] or next-day open [T+1]) and ensure outputs include cost-adjusted metrics.
-- When instructing Python execution, explicitly state in the inputs: "Use only the existing downloaded dataset(s) in the workspace; external market data APIs are prohibited."
-- Strategy implementation and the initial backtest must occur in a single step; require the generated code to integrate signal generation and evaluation using the `TradingStrategy` interface from `src/tools/strategy.py`.
-- When invoking `python_execution` for the combined implementation/backtest step, instruct the agent to produce scripts/classes compatible with that interface (e.g., subclassing `TradingStrategy` and executing its `backtest` method) so downstream tooling can reuse the artifact.
-- Embed the following interface snippet verbatim inside that step's "inputs" so the executor has direct access without referencing repository files:
-- Final deliverable must be `final_report.md` that embeds narrative text, displays generated charts via `<img>` tags, and links to supporting CSV/JSON artifacts.
-- For report writing and summarization tasks, invoke `file_saver` (optionally preceded by `find_in_file`) instead of `python_execution`.
-- Strategy refinement cycles should be consolidated into a single step that references all iterations and compares versions after accounting for costs and settlement assumptions.
-- Ensure an inspection task (using `python_execution` or `find_in_file`) captures file structure, schema, column types, missing value handling, and relevant metadata (e.g., `data_structure_notes_v1.md`) before any transformations begin; cite this artifact in later steps.
-
-MODULE GUIDANCE (flexible, do not rigidly template):
-- Research discovery and note: typically 2-3 step using web_search and file_saver tools.
-- Data understanding & preparation: usually 1-2 steps depending on complexity and number of datasets.
-- Strategy implementation & backtest: a single step that builds the strategy code and runs the initial cost-adjusted evaluation.
-- Reporting & handoff: 1 step producing the markdown deliverable with embedded visuals and data links.
-
-Ensure the resulting JSON array follows the specified schema and that each step is fully self-contained."""
+        # Shared by the parsed and fallback plans below
+        plan_id = f"plan_{time.time_ns()}"
+        task = _PLANNER_TASK_PREFIX + user_request + _PLANNER_TASK_SUFFIX
         
         result = await self.execute_task(task)
         
@@ -164,306 +452,96 @@ Ensure the resulting JSON array follows the specified schema and that each step
         try:
             # Extract JSON from response
             response = result.get("result", "")
-            print(f"LLM-RESPONSE plan: {response}")
-            # Find JSON array in response
-            start = response.find("[")
-            end = response.rfind("]") + 1
-            
-            if start != -1 and end > start:
-                plan_json = response[start:end]
-                steps = json.loads(plan_json)
-            else:
-                # Fallback: create basic plan structure
-                steps = self._create_default_plan(user_request)
-            
-            plan = WorkflowPlan(
-                plan_id=f"plan_{datetime.utcnow().timestamp()}",
-                user_request=user_request,
-                steps=steps,
-                estimated_duration_minutes=len(steps) * 5
-            )
-            
-            return plan
-            
-        except Exception as e:
+            logger.debug("LLM-RESPONSE plan: %s", response)
+            # Decode the JSON array starting at the first "["; a response without
+            # one raises ValueError and takes the default-plan path below
+            steps = _decode_steps(response, response.index("["))
+            if not all(isinstance(step, dict) for step in steps):
+                raise ValueError("Plan steps must be JSON objects")
+        except Exception:
             # Fallback to default plan
             steps = self._create_default_plan(user_request)
-            return WorkflowPlan(
-                plan_id=f"plan_{datetime.utcnow().timestamp()}",
-                user_request=user_request,
-                steps=steps
-            )
+        
+        return WorkflowPlan(
+            plan_id=plan_id,
+            user_request=user_request,
+            steps=steps,
+            estimated_duration_minutes=len(steps) * 5
+        )
     
     def _create_default_plan(self, user_request: str) -> List[Dict[str, Any]]:
         """Create a comprehensive default plan when LLM output is unusable."""
-        request_type = self._determine_request_type(user_request)
-        ticker = self._extract_ticker(user_request)
-        strategy_descriptor = self._extract_strategy_descriptor(user_request)
-        indicator = self._extract_indicator(user_request)
+        lowered = user_request.lower()
         end_date = datetime.utcnow().date()
-        start_date = end_date - timedelta(days=730)
-        trading_days_estimate = 502
-        interval = "1d"
-
-        if request_type == "eda":
-            return self._build_eda_plan(
-                ticker=ticker,
-                start_date=start_date,
-                end_date=end_date,
-                interval=interval,
-                trading_days_estimate=trading_days_estimate,
-                indicator=indicator
-            )
-        if request_type == "hypothesis":
-            return self._build_hypothesis_plan(
-                ticker=ticker,
-                start_date=start_date,
-                end_date=end_date,
-                interval=interval,
-                trading_days_estimate=trading_days_estimate,
-                strategy_descriptor=strategy_descriptor
-            )
-
-        return self._build_strategy_plan(
-            ticker=ticker,
-            strategy_descriptor=strategy_descriptor,
-            indicator=indicator,
-            start_date=start_date,
+        plan_ctx = _PlanCtx(
+            ticker=_extract_ticker(user_request),
+            strategy_descriptor=_extract_strategy_descriptor(lowered),
+            indicator=_extract_indicator(user_request),
+            start_date=end_date - timedelta(days=730),
             end_date=end_date,
-            interval=interval,
-            trading_days_estimate=trading_days_estimate
+            interval="1d",
+            trading_days_estimate=502
         )
-
-    def _build_strategy_plan(
-        self,
-        ticker: str,
-        strategy_descriptor: str,
-        indicator: str,
-        start_date: date,
-        end_date: date,
-        interval: str,
-        trading_days_estimate: int
-    ) -> List[Dict[str, Any]]:
-        research_notes_filename = "research_notes.md"
-        data_inventory_filename = f"{ticker}_data_inventory.json"
-        processed_filename = f"processed_{ticker}_data.csv"
-        stats_filename = "summary_statistics.csv"
-        quality_report_filename = "data_quality_report.txt"
-        strategy_results_filename = "strategy_backtest_results.csv"
-        equity_curve_filename = "strategy_performance.png"
-        metrics_filename = "performance_metrics.json"
-        comparison_filename = "strategy_comparison.json"
-        markdown_report_filename = "final_report.md"
-
-        return [
-            {
-                "step_number": 1,
-                "objective": f"Conduct deep-dive online research capturing macroeconomic backdrop, sector catalysts, market sentiment, and regulatory considerations relevant to {ticker} {strategy_descriptor} strategy design, saving grounded findings for later reference",
-                "required_tools": ["web_search", "file_saver"],
-                "inputs": "Minimum 5 up-to-date sources (within last 12 months where possible) covering macro trends, sector performance, institutional sentiment, and policy news impacting the target tickers; include search variations for market outlook, analyst commentary, and risk factors",
-                "outputs": f"{research_notes_filename} summarizing key insights with citations, bullet list of market drivers, sentiment snapshot, macro themes, and regulatory notes; appended source URL list",
-                "success_criteria": f"{research_notes_filename} exists with sections for Macroeconomics, Market Sentiment, Sector Drivers, Risks, Opportunities; cites ≥5 distinct credible sources with access dates"
-            },
-            {
-                "step_number": 2,
-                "objective": f"Inventory and validate existing workspace datasets covering {ticker} from {start_date} to {end_date} at {interval} intervals, then engineer {indicator} features while documenting data quality findings",
-                "required_tools": ["python_execution", "file_saver"],
-                "inputs": "Use only CSV files already present in workspace (e.g., workspaces/.../*.csv); task description must state 'Use only existing downloaded dataset(s); do NOT call yfinance or other live APIs'; indicator window=20 days; trading days target={trading_days_estimate}",
-                "outputs": f"{data_inventory_filename} listing located datasets with date ranges/columns, {processed_filename} containing cleaned OHLCV data plus {indicator} column, {stats_filename} with descriptive stats, {quality_report_filename} recording missing data handling and assumptions",
-                "success_criteria": f"{processed_filename} retains ≥{trading_days_estimate - 80} rows, {indicator} populated without NaNs, {quality_report_filename} confirms no live API calls and documents any imputations"
-            },
-            {
-                "step_number": 3,
-                "objective": f"Build and backtest the initial {strategy_descriptor} strategy in one pass using the `TradingStrategy` interface, combining signal generation, execution frictions (5 bps per leg), and settlement handling (T+1 base with T+0 sensitivity)",
-                "required_tools": ["python_execution", "file_saver"],
-                "inputs": (
-                    f"Dataset: {processed_filename}; implement a class that subclasses `TradingStrategy` in src/tools/strategy.py, encapsulating {indicator}-driven logic, cost handling (5 bps), and settlement toggle; include helper to run `backtest` for T+1 baseline and T+0 sensitivity; "
-                    "execution instructions must reiterate the offline data constraint and direct the script to persist metrics and plots in workspace.\n"
-                    "Copy this strategy interface snippet verbatim before coding so the environment has the full definition:\n\n"
-                    f"{STRATEGY_INTERFACE_SNIPPET}"
-                ),
-                "outputs": (
-                    "strategy_v1.py defining the TradingStrategy-compliant class and invoking its backtest routine, "
-                    f"{strategy_results_filename} with scenario-labelled returns, results_v1.json capturing key cost-adjusted metrics, {metrics_filename} summarizing CAGR/Sharpe/Sortino/Max Drawdown/Win Rate for each settlement assumption, "
-                    f"{equity_curve_filename} overlaying strategy vs benchmark, and execution log saved as evaluation_v1.md summarizing methodological notes"
-                ),
-                "success_criteria": (
-                    "strategy_v1.py instantiates a TradingStrategy subclass with initialize/generate_signals/backtest methods, runs without external data calls, and produces cost-adjusted artifacts for both T+1 and T+0 scenarios"
-                )
-            },
-            {
-                "step_number": 4,
-                "objective": f"Synthesize evaluator and judger feedback to iterate on the {strategy_descriptor} logic (strategy_v1 → strategy_v2 → strategy_v3 if needed), ensuring each revision quantifies improvements net of trading costs and settlement effects",
-                "required_tools": ["python_execution", "file_saver", "regression_based_strategy_evaluation", "find_in_file"],
-                "inputs": f"Artifacts: strategy_v1.py, {strategy_results_filename}, results_v1.json, {processed_filename}, evaluation_v1.md, feedback files, cost assumptions (5 bps), settlement options (T+1 base, T+0 sensitivity); reiterate offline data constraint in execution instructions",
-                "outputs": "If improvements are attempted, produce strategy_v2.py/results_v2.json/evaluation_v2.md/feedback_v2.txt (and strategy_v3.py/... as needed) plus {comparison_filename} compiling key metrics across versions and settlement scenarios",
-                "success_criteria": f"Each iteration documents changes, produces cost-adjusted metrics matching the TradingStrategy interface outputs, and {comparison_filename} highlights the best-performing version with settlement context"
-            },
-            {
-                "step_number": 5,
-                "objective": "Generate markdown deliverable summarizing research context, data preparation, strategy iterations, and performance comparisons with embedded visuals and links to supporting artifacts",
-                "required_tools": ["find_in_file", "file_saver"],
-                "inputs": f"Inputs: {research_notes_filename}, {processed_filename}, {metrics_filename}, {equity_curve_filename}, {comparison_filename}, evaluation and feedback docs; ensure markdown references local images and links to CSV/JSON files",
-                "outputs": f"{markdown_report_filename} containing narrative sections (Executive Summary, Market Context, Data Preparation, Strategy Results, Risk Considerations, Next Steps), embedded image for {equity_curve_filename}, hyperlinks to datasets and metrics files",
-                "success_criteria": f"{markdown_report_filename} exists, renders embedded chart and working hyperlinks, explicitly states recommended strategy version and settlement assumption based on cost-adjusted metrics"
-            }
-        ]
-
-    def _build_eda_plan(
-        self,
-        ticker: str,
-        start_date: date,
-        end_date: date,
-        interval: str,
-        trading_days_estimate: int,
-        indicator: str
-    ) -> List[Dict[str, Any]]:
-        research_notes_filename = "research_notes.md"
-        cleaned_filename = f"cleaned_{ticker}_data.csv"
-        stats_filename = "summary_statistics.csv"
-        quality_report_filename = "data_quality_report.txt"
-        eda_metrics_filename = "eda_metrics.json"
-        metrics_summary_filename = "eda_metrics_summary.txt"
-        visualization_prefix = f"{ticker}_eda"
-        markdown_report_filename = "eda_report.md"
-
-        return [
-            {
-                "step_number": 1,
-                "objective": f"Compile comprehensive background research for {ticker} covering macro environment, sector performance, sentiment, and recent news to contextualize exploratory data analysis",
-                "required_tools": ["web_search", "file_saver"],
-                "inputs": "At least 5 reputable, recent sources spanning macro trends, sector commentary, analyst views, and risk factors; include varied queries targeting sentiment and regulatory considerations",
-                "outputs": f"{research_notes_filename} summarizing macro factors, sentiment indicators, sector drivers, and risks/opportunities with cited URLs",
-                "success_criteria": f"{research_notes_filename} contains dedicated sections for Macro, Sector, Sentiment, Risks, cites ≥5 sources, and notes data relevance timeframe"
-            },
-            {
-                "step_number": 2,
-                "objective": f"Identify and cleanse existing workspace datasets for {ticker} ({start_date} to {end_date}, interval {interval}), recording data quality decisions while engineering {indicator}",
-                "required_tools": ["python_execution", "file_saver"],
-                "inputs": "Use only pre-downloaded CSVs within workspace (e.g., workspaces/.../*.csv); task description must forbid live API usage; cleaning rules: forward-fill gaps ≤3 days, drop rows missing Close; indicator window=20",
-                "outputs": f"{cleaned_filename} with OHLCV plus {indicator}, {stats_filename} capturing descriptive statistics, {quality_report_filename} documenting located files, coverage, missing data handling, and confirmation of no external downloads",
-                "success_criteria": f"{cleaned_filename} retains ≥{trading_days_estimate - 100} observations, {indicator} contains no NaNs, {quality_report_filename} explicitly confirms offline-only data usage"
-            },
-            {
-                "step_number": 3,
-                "objective": f"Compute exploratory analytics (returns distribution, rolling volatility, volume dynamics, correlations) on {cleaned_filename} to uncover structural patterns",
-                "required_tools": ["python_execution", "file_saver"],
-                "inputs": f"Dataset: {cleaned_filename}; metrics: daily returns, rolling 20-day volatility, autocorrelation lags (1,5,20), volume z-scores, correlation matrix between price changes, volume, {indicator}; execution instructions must restate offline data constraint",
-                "outputs": f"{eda_metrics_filename} containing computed metrics and correlation matrices, {metrics_summary_filename} describing notable patterns and anomalies",
-                "success_criteria": f"All computed metrics stored without NaNs, {metrics_summary_filename} highlights ≥3 insights referencing quantitative evidence"
-            },
-            {
-                "step_number": 4,
-                "objective": f"Produce visualization set showcasing price vs {indicator}, returns distribution, rolling volatility, and volume behavior to support qualitative assessment",
-                "required_tools": ["python_execution", "file_saver"],
-                "inputs": f"Source data: {cleaned_filename}; charts: price+{indicator} line, returns histogram, rolling volatility line, volume bar with z-score overlay; reiterate offline data constraint in task description",
-                "outputs": f"PNG files {visualization_prefix}_trend.png, {visualization_prefix}_returns_hist.png, {visualization_prefix}_volatility.png, {visualization_prefix}_volume.png with labeled axes and legends",
-                "success_criteria": "All PNGs generated successfully, visually clear with titles, stored paths logged"
-            },
-            {
-                "step_number": 5,
-                "objective": "Assemble markdown summary communicating research context, data quality decisions, key EDA findings, and visual evidence with linked artifacts for follow-up investigations",
-                "required_tools": ["find_in_file", "file_saver"],
-                "inputs": f"Inputs: {research_notes_filename}, {stats_filename}, {quality_report_filename}, {eda_metrics_filename}, {metrics_summary_filename}, visualization PNGs; ensure Markdown embeds images via ![image](<img>) and links to CSV/JSON resources",
-                "outputs": f"{markdown_report_filename} containing sections (Context, Data Audit, Exploratory Metrics, Visual Insights, Recommendations) with embedded charts and hyperlinks to supporting files",
-                "success_criteria": f"{markdown_report_filename} exists, renders embedded images, links resolve to workspace files, includes actionable recommendations aligned with findings"
-            }
-        ]
-
-    def _build_hypothesis_plan(
-        self,
-        ticker: str,
-        start_date: date,
-        end_date: date,
-        interval: str,
-        trading_days_estimate: int,
-        strategy_descriptor: str
-    ) -> List[Dict[str, Any]]:
-        research_notes_filename = "research_notes.md"
-        prepared_filename = f"prepared_{ticker}_dataset.csv"
-        hypothesis_doc = "hypothesis_design.md"
-        test_results_filename = "hypothesis_test_results.json"
-        visualization_filename = f"{ticker}_hypothesis_diagnostics.png"
-        conclusion_filename = "hypothesis_conclusions.md"
-        quality_report_filename = "data_quality_report.md"
-
-        return [
-            {
-                "step_number": 1,
-                "objective": f"Gather comprehensive background research for {ticker} focusing on macro trends, sector dynamics, sentiment, and regulatory factors that could influence {strategy_descriptor} hypotheses",
-                "required_tools": ["web_search", "file_saver"],
-                "inputs": "Use ≥5 recent authoritative sources covering macro, sentiment, industry outlook, and risk considerations; include varied queries encompassing hypothesis topic",
-                "outputs": f"{research_notes_filename} detailing contextual insights with citations supporting hypothesis framing",
-                "success_criteria": f"{research_notes_filename} includes sections for Macro Context, Sentiment, Sector Drivers, Regulatory/Risk Notes, with ≥5 cited sources"
-            },
-            {
-                "step_number": 2,
-                "objective": f"Assemble feature-ready dataset for hypothesis testing using only existing workspace CSVs spanning {start_date} to {end_date} at {interval} intervals, documenting data quality decisions",
-                "required_tools": ["python_execution", "file_saver"],
-                "inputs": "Task description must state: 'Use only downloaded dataset(s); no live API access permitted'; engineering requirements: daily returns, 20-day and 50-day moving averages, rolling 20-day volatility, volume z-scores",
-                "outputs": f"{prepared_filename} with engineered features, {quality_report_filename} summarizing source files, coverage, missing data handling, and confirmation of offline-only approach",
-                "success_criteria": f"{prepared_filename} retains ≥{trading_days_estimate - 100} rows with no missing feature values, {quality_report_filename} records data lineage and quality checks"
-            },
-            {
-                "step_number": 3,
-                "objective": "Formulate statistical hypotheses, select appropriate tests, and document methodology including treatment of trading frictions where relevant",
-                "required_tools": ["find_in_file", "file_saver"],
-                "inputs": f"Context from {research_notes_filename}, dataset summary from {quality_report_filename}, significance level α=0.05, note any trading cost or settlement assumptions influencing expected effects",
-                "outputs": f"{hypothesis_doc} outlining null/alternative hypotheses, test selection (e.g., t-test, Mann-Whitney, variance ratio), assumptions, and evaluation criteria",
-                "success_criteria": f"{hypothesis_doc} includes hypothesis statements, statistical test plan, assumptions validation checklist, and links back to contextual research"
-            },
-            {
-                "step_number": 4,
-                "objective": "Execute planned statistical tests, compute effect sizes, and visualize diagnostics while ensuring reproducibility under offline data constraints",
-                "required_tools": ["python_execution", "file_saver"],
-                "inputs": f"Dataset: {prepared_filename}, Plan: {hypothesis_doc}; tests to include mean return t-test, volatility comparison, distribution shift analysis; reiterate offline-only data rule in task description",
-                "outputs": f"{test_results_filename} capturing statistics, p-values, confidence intervals, effect sizes; {visualization_filename} summarizing diagnostic plots (QQ plots, rolling stats)",
-                "success_criteria": f"{test_results_filename} lists all tests with interpretation fields populated, {visualization_filename} generated without errors, execution logs confirm no live data calls"
-            },
-            {
-                "step_number": 5,
-                "objective": "Synthesize conclusions in interactive markdown summarizing hypothesis outcomes, practical implications, limitations, and recommended next experiments",
-                "required_tools": ["find_in_file", "file_saver"],
-                "inputs": f"Inputs: {research_notes_filename}, {hypothesis_doc}, {test_results_filename}, {visualization_filename}; Markdown must embed diagnostics via ![image](<img>) and link to dataset/features/notes",
-                "outputs": f"{conclusion_filename} with sections (Context, Hypotheses, Results, Practical Interpretation, Limitations, Next Steps) including embedded diagnostics and hyperlinks",
-                "success_criteria": f"{conclusion_filename} exists, renders embedded visualization, references key statistics, and clearly states accept/reject decisions for each hypothesis"
-            }
-        ]
-
-    def _determine_request_type(self, user_request: str) -> str:
-        lowered = user_request.lower()
-        hypothesis_keywords = ["hypothesis", "test", "significance", "statistical", "p-value"]
-        eda_keywords = ["explore", "eda", "visual", "dashboard", "pattern", "insight", "analysis"]
-        strategy_keywords = ["strategy", "trading", "momentum", "mean reversion", "alpha", "portfolio", "backtest"]
-
-        if any(keyword in lowered for keyword in hypothesis_keywords):
-            return "hypothesis"
-        if any(keyword in lowered for keyword in eda_keywords):
-            return "eda"
-        if any(keyword in lowered for keyword in strategy_keywords):
-            return "strategy"
-        return "strategy"
-
-    def _extract_ticker(self, user_request: str) -> str:
-        match = re.findall(r"\b[A-Z]{2,5}\b", user_request)
-        return match[0] if match else "SYMBOL"
-
-    def _extract_indicator(self, user_request: str) -> str:
-        indicator_match = re.search(r"(\d+[- ]?(day|period)[- ]?(MA|EMA|SMA))", user_request, re.IGNORECASE)
-        if indicator_match:
-            return indicator_match.group(1).replace(" ", "-")
-        return "20-day moving average"
-
-    def _extract_strategy_descriptor(self, user_request: str) -> str:
-        keywords = [
-            ("momentum", "momentum"),
-            ("mean reversion", "mean reversion"),
-            ("pairs", "pairs trading"),
-            ("volatility", "volatility-based"),
-            ("trend", "trend-following")
-        ]
-        lowered = user_request.lower()
-        for phrase, descriptor in keywords:
-            if phrase in lowered:
-                return descriptor
-        return "quantitative"
+        steps = self._build_default_plan_cached(_determine_request_type(lowered), plan_ctx)
+        # Copy the steps so callers can modify the plan without touching the cache
+        return [dict(step, required_tools=list(step["required_tools"])) for step in steps]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _build_default_plan_cached(request_type: str, plan_ctx: _PlanCtx) -> Tuple[Dict[str, Any], ...]:
+        """Default plan steps for a request; the context carries the dates, so plans roll over daily"""
+        if request_type == "eda":
+            return tuple(PlannerAgent._build_eda_plan(plan_ctx))
+        if request_type == "hypothesis":
+            return tuple(PlannerAgent._build_hypothesis_plan(plan_ctx))
+        return tuple(PlannerAgent._build_strategy_plan(plan_ctx))
+
+    @staticmethod
+    def _build_strategy_plan(plan_ctx: _PlanCtx) -> List[Dict[str, Any]]:
+        ctx = {
+            **_plan_fields(plan_ctx),
+            "min_rows": plan_ctx.trading_days_estimate - 80,
+            "strategy_interface": STRATEGY_INTERFACE_SNIPPET,
+            "research_notes_filename": _ARTIFACT_RESEARCH_NOTES,
+            "data_inventory_filename": f"{plan_ctx.ticker}_data_inventory.json",
+            "processed_filename": f"processed_{plan_ctx.ticker}_data.csv",
+            "stats_filename": _ARTIFACT_SUMMARY_STATISTICS,
+            "quality_report_filename": _ARTIFACT_DATA_QUALITY_REPORT,
+            "strategy_results_filename": "strategy_backtest_results.csv",
+            "equity_curve_filename": "strategy_performance.png",
+            "metrics_filename": "performance_metrics.json",
+            "comparison_filename": "strategy_comparison.json",
+            "markdown_report_filename": _ARTIFACT_FINAL_REPORT
+        }
+        return _render_plan(_STRATEGY_PLAN_TEMPLATE, ctx)
+
+    @staticmethod
+    def _build_eda_plan(plan_ctx: _PlanCtx) -> List[Dict[str, Any]]:
+        ctx = {
+            **_plan_fields(plan_ctx),
+            "min_rows": plan_ctx.trading_days_estimate - 100,
+            "research_notes_filename": _ARTIFACT_RESEARCH_NOTES,
+            "cleaned_filename": f"cleaned_{plan_ctx.ticker}_data.csv",
+            "stats_filename": _ARTIFACT_SUMMARY_STATISTICS,
+            "quality_report_filename": _ARTIFACT_DATA_QUALITY_REPORT,
+            "eda_metrics_filename": "eda_metrics.json",
+            "metrics_summary_filename": "eda_metrics_summary.txt",
+            "visualization_prefix": f"{plan_ctx.ticker}_eda",
+            "markdown_report_filename": "eda_report.md"
+        }
+        return _render_plan(_EDA_PLAN_TEMPLATE, ctx)
+
+    @staticmethod
+    def _build_hypothesis_plan(plan_ctx: _PlanCtx) -> List[Dict[str, Any]]:
+        ctx = {
+            **_plan_fields(plan_ctx),
+            "min_rows": plan_ctx.trading_days_estimate - 100,
+            "research_notes_filename": _ARTIFACT_RESEARCH_NOTES,
+            "prepared_filename": f"prepared_{plan_ctx.ticker}_dataset.csv",
+            "hypothesis_doc": "hypothesis_design.md",
+            "test_results_filename": "hypothesis_test_results.json",
+            "visualization_filename": f"{plan_ctx.ticker}_hypothesis_diagnostics.png",
+            "conclusion_filename": "hypothesis_conclusions.md",
+            "quality_report_filename": "data_quality_report.md"
+        }
+        return _render_plan(_HYPOTHESIS_PLAN_TEMPLATE, ctx)
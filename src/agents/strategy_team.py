@@ -6,15 +6,24 @@ from typing import List, Dict, Any, Optional
 from src.agents.base_agent import BaseAgent
 
 
+# StrategySynthesizerAgent.generate_strategy task text for the first and later iterations
+_INITIAL_TASK_TEMPLATE = """Generate a trading strategy for: {user_request}
+
+Create complete, executable Python code following the standard template.
+Save the code to 'strategy_v1.py'."""
+
+_REFINE_TASK_TEMPLATE = """Refine the previous strategy based on this feedback:
+
+{feedback}
+
+Generate improved strategy code for iteration {iteration}.
+Save the code to 'strategy_v{iteration}.py'."""
+
+
 class StrategySynthesizerAgent(BaseAgent):
     """Generates trading strategies as executable Python code"""
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.agent_type = "strategy_synthesizer"
-    
-    def get_system_prompt(self) -> str:
-        return """You are an expert Quantitative Developer specializing in trading strategy development.
+    SYSTEM_PROMPT = """You are an expert Quantitative Developer specializing in trading strategy development.
 
 Your role is to generate executable Python code for trading strategies.
 
@@ -56,6 +65,13 @@ if __name__ == "__main__":
 When given feedback, incorporate it to improve the strategy.
 Focus on the specific suggestions provided."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.agent_type = "strategy_synthesizer"
+    
+    def get_system_prompt(self) -> str:
+        return self.SYSTEM_PROMPT
+    
     def get_available_tools(self) -> List[str]:
         return ["file_saver"]
     
@@ -64,21 +80,11 @@ Focus on the specific suggestions provided."""
         user_request: str,
         iteration: int,
         feedback: Optional[str] = None
-    ) -> str:
-        """Generate strategy code"""
+    ) -> Dict[str, Any]:
+        """Generate strategy code (returns the execute_task result)"""
         
-        if iteration == 1:
-            task = f"""Generate a trading strategy for: {user_request}
-
-Create complete, executable Python code following the standard template.
-Save the code to 'strategy_v1.py'."""
-        else:
-            task = f"""Refine the previous strategy based on this feedback:
-
-{feedback}
-
-Generate improved strategy code for iteration {iteration}.
-Save the code to 'strategy_v{iteration}.py'."""
+        template = _INITIAL_TASK_TEMPLATE if iteration == 1 else _REFINE_TASK_TEMPLATE
+        task = template.format(user_request=user_request, iteration=iteration, feedback=feedback)
         
         result = await self.execute_task(task)
         return result
@@ -87,12 +93,7 @@ Save the code to 'strategy_v{iteration}.py'."""
 class StrategyEvaluatorAgent(BaseAgent):
     """Executes strategies and calculates performance metrics"""
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.agent_type = "strategy_evaluator"
-    
-    def get_system_prompt(self) -> str:
-        return """You are a Backtesting Engine Operator and Performance Analyst.
+    SYSTEM_PROMPT = """You are a Backtesting Engine Operator and Performance Analyst.
 
 Your role is to:
 1. Execute strategy code in the sandbox
@@ -225,19 +226,23 @@ For each strategy evaluation, you MUST:
 
 Be systematic, thorough, and analytical in your evaluation reports."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.agent_type = "strategy_evaluator"
+        # Tool list is static per agent; resolve it once
+        self._available_tools = self.tool_registry.get_tools_for_agent("strategy_evaluator")
+    
+    def get_system_prompt(self) -> str:
+        return self.SYSTEM_PROMPT
+    
     def get_available_tools(self) -> List[str]:
-        return self.tool_registry.get_tools_for_agent("strategy_evaluator")
+        return self._available_tools
 
 
 class JudgerAgent(BaseAgent):
     """Evaluates strategies and provides constructive feedback"""
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.agent_type = "judger"
-    
-    def get_system_prompt(self) -> str:
-        return """You are the Head of Quantitative Research and Risk Management.
+    SYSTEM_PROMPT = """You are the Head of Quantitative Research and Risk Management.
 
 Your role is to evaluate trading strategies using a rigorous rubric.
 
@@ -261,6 +266,13 @@ Your feedback should be constructive and technical:
 
 Save your feedback to feedback_v{N}.txt."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.agent_type = "judger"
+    
+    def get_system_prompt(self) -> str:
+        return self.SYSTEM_PROMPT
+    
     def get_available_tools(self) -> List[str]:
         return ["find_in_file", "file_saver"]
     
@@ -4,17 +4,82 @@ Generates comprehensive final reports
 """
 from typing import List, Optional
 from src.agents.base_agent import BaseAgent
+import functools
+
+
+# generate_report task text; the journal and file list are spliced in between
+_TASK_HEAD = """Generate a comprehensive investment memo for the completed analysis.
+
+Original Request: """
+
+_JOURNAL_SECTION_HEAD = """
+
+### Complete Workflow Journal
+
+The following is the complete execution journal with all context, thoughts, actions, and results:
+
+```markdown
+"""
+
+_JOURNAL_SECTION_TAIL = """
+```
+
+"""
+
+_TASK_FILES_HEADER = """
+
+Available files in workspace (for reference):
+"""
+
+_TASK_TAIL = """
+
+**EVALUATION REPORTS (if available):**
+- evaluation_v1.md - Detailed analysis of first iteration
+- evaluation_v2.md - Detailed analysis of second iteration  
+- evaluation_v3.md - Detailed analysis of final iteration
+
+These evaluation reports contain comprehensive metrics analysis, strengths/weaknesses, 
+and recommendations. Use them to synthesize your Strategy Evolution Comparison section.
+
+**CRITICAL REQUIREMENTS:**
+
+1. **IDENTIFY THE FINAL STRATEGY FILE:** 
+   - Look for strategy_v1.py, strategy_v2.py, strategy_v3.py (or similar versioned files)
+   - The highest version number is typically the final recommended strategy
+   - CLEARLY STATE in the Executive Summary: "The final recommended strategy is: strategy_vX.py"
+   - Repeat this in the Final Recommendation section
+
+2. **COMPARE ALL STRATEGY ITERATIONS:**
+   - Create a comparison table showing all strategy versions tested
+   - Include key metrics for each: Total Return, Sharpe Ratio, Max Drawdown, Alpha, Beta
+   - Explain what changed between versions and why the final version is superior
+   - If only one strategy exists, note that no iterations were performed
+
+3. **BE SPECIFIC WITH FILE REFERENCES:**
+   - When discussing implementation details, reference the exact Python filename
+   - Example: "See strategy_v3.py lines 45-60 for position sizing logic"
+
+You have ALL the information you need in the journal above. Synthesize everything into a professional report following the structure in your instructions.
+
+Reference specific files as evidence where appropriate.
+
+Save the report to final_report.md and call finish() when done."""
+
+
+@functools.lru_cache(maxsize=4)
+def _build_writer_task(user_request: str, files_list: str, journal_content: Optional[str]) -> str:
+    """Writer task text; cached so a repeated report request doesn't copy the journal again"""
+    parts = [_TASK_HEAD, user_request, "\n\n"]
+    if journal_content:
+        parts += (_JOURNAL_SECTION_HEAD, journal_content, _JOURNAL_SECTION_TAIL)
+    parts += (_TASK_FILES_HEADER, files_list, _TASK_TAIL)
+    return "".join(parts)
 
 
 class WriterAgent(BaseAgent):
     """Report writer that synthesizes all findings"""
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.agent_type = "writer"
-    
-    def get_system_prompt(self) -> str:
-        return """You are an expert Financial Analyst and Report Writer for a top-tier hedge fund.
+    SYSTEM_PROMPT = """You are an expert Financial Analyst and Report Writer for a top-tier hedge fund.
 
 Your role is to synthesize all research findings into a professional investment memo.
 
@@ -90,6 +155,13 @@ IMPORTANT WORKFLOW:
 
 Remember: ALWAYS save the final report before calling finish(). The journal has all the information you need!"""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.agent_type = "writer"
+    
+    def get_system_prompt(self) -> str:
+        return self.SYSTEM_PROMPT
+    
     def get_available_tools(self) -> List[str]:
         return ["file_saver"]  # Removed find_in_file since journal has everything
     
@@ -101,63 +173,10 @@ Remember: ALWAYS save the final report before calling finish(). The journal has
     ) -> str:
         """Generate comprehensive final report with journal context"""
         
-        files_list = "\n".join([f"- {f}" for f in all_files])
+        files_list = "- " + "\n- ".join(all_files) if all_files else ""
         
         # Include journal content directly in the task
-        journal_section = ""
-        if journal_content:
-            journal_section = f"""
-
-### Complete Workflow Journal
-
-The following is the complete execution journal with all context, thoughts, actions, and results:
-
-```markdown
-{journal_content}
-```
-
-"""
-        
-        task = f"""Generate a comprehensive investment memo for the completed analysis.
-
-Original Request: {user_request}
-
-{journal_section}
-
-Available files in workspace (for reference):
-{files_list}
-
-**EVALUATION REPORTS (if available):**
-- evaluation_v1.md - Detailed analysis of first iteration
-- evaluation_v2.md - Detailed analysis of second iteration  
-- evaluation_v3.md - Detailed analysis of final iteration
-
-These evaluation reports contain comprehensive metrics analysis, strengths/weaknesses, 
-and recommendations. Use them to synthesize your Strategy Evolution Comparison section.
-
-**CRITICAL REQUIREMENTS:**
-
-1. **IDENTIFY THE FINAL STRATEGY FILE:** 
-   - Look for strategy_v1.py, strategy_v2.py, strategy_v3.py (or similar versioned files)
-   - The highest version number is typically the final recommended strategy
-   - CLEARLY STATE in the Executive Summary: "The final recommended strategy is: strategy_vX.py"
-   - Repeat this in the Final Recommendation section
-
-2. **COMPARE ALL STRATEGY ITERATIONS:**
-   - Create a comparison table showing all strategy versions tested
-   - Include key metrics for each: Total Return, Sharpe Ratio, Max Drawdown, Alpha, Beta
-   - Explain what changed between versions and why the final version is superior
-   - If only one strategy exists, note that no iterations were performed
-
-3. **BE SPECIFIC WITH FILE REFERENCES:**
-   - When discussing implementation details, reference the exact Python filename
-   - Example: "See strategy_v3.py lines 45-60 for position sizing logic"
-
-You have ALL the information you need in the journal above. Synthesize everything into a professional report following the structure in your instructions.
-
-Reference specific files as evidence where appropriate.
-
-Save the report to final_report.md and call finish() when done."""
+        task = _build_writer_task(user_request, files_list, journal_content)
         
         result = await self.execute_task(task)
         return result.get("result", "")
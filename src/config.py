@@ -3,66 +3,128 @@ System Configuration
 """
 import os
 import sys
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Config attribute holding the API key for each LLM provider
+_PROVIDER_KEY_ATTR = {
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+    "siliconflow": "SILICONFLOW_API_KEY"
+}
 
+
+def _env_int(name: str, default: int) -> int:
+    """Integer environment variable, failing at startup with a clear message if malformed"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Environment variable {name} must be an integer, got {value!r}") from None
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """System configuration"""
+    """System configuration, read from the environment by Config.load()"""
     
     # LLM Configuration
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-    ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
+    OPENAI_API_KEY: str
+    ANTHROPIC_API_KEY: str
     
     # SiliconFlow Configuration
-    SILICONFLOW_API_KEY = os.getenv("SILICONFLOW_API_KEY", "")
-    SILICONFLOW_API_ENDPOINT = os.getenv("SILICONFLOW_API_ENDPOINT", "https://api.siliconflow.cn/v1/chat/completions")
-    SILICONFLOW_MODEL = os.getenv("SILICONFLOW_MODEL", "deepseek-ai/DeepSeek-V3.1-Terminus")
+    SILICONFLOW_API_KEY: str
+    SILICONFLOW_API_ENDPOINT: str
+    SILICONFLOW_MODEL: str
+    SILICONFLOW_MAX_CONNECTIONS: int
+    SILICONFLOW_MAX_KEEPALIVE: int
     
-    DEFAULT_LLM_PROVIDER = os.getenv("DEFAULT_LLM_PROVIDER", "siliconflow")
-    DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "deepseek-ai/DeepSeek-V3.1-Terminus")
-    CODE_LLM_PROVIDER = os.getenv("CODE_LLM_PROVIDER", DEFAULT_LLM_PROVIDER)
-    CODE_LLM_MODEL = os.getenv("CODE_LLM_MODEL", DEFAULT_MODEL)
-    LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "4096"))
-    LLM_CODE_MAX_TOKENS = int(os.getenv("LLM_CODE_MAX_TOKENS", "2048"))
+    DEFAULT_LLM_PROVIDER: str
+    DEFAULT_MODEL: str
+    CODE_LLM_PROVIDER: str
+    CODE_LLM_MODEL: str
+    LLM_MAX_TOKENS: int
+    LLM_CODE_MAX_TOKENS: int
     
     # Server Configuration
-    HOST = os.getenv("HOST", "0.0.0.0")
-    PORT = int(os.getenv("PORT", 8000))
+    HOST: str
+    PORT: int
+    SERVER_WORKERS: int
+    SERVER_RELOAD: bool
     
     # Workspace Configuration
-    BASE_DIR = Path(__file__).parent.parent
-    WORKSPACE_ROOT = Path(os.getenv("WORKSPACE_ROOT", BASE_DIR / "workspaces"))
-    WORKSPACE_ROOT.mkdir(exist_ok=True)
+    BASE_DIR: Path
+    WORKSPACE_ROOT: Path
     
     # Sandbox Configuration
-    SANDBOX_TIMEOUT = int(os.getenv("SANDBOX_TIMEOUT", 300))
-    SANDBOX_MAX_MEMORY_MB = int(os.getenv("SANDBOX_MAX_MEMORY_MB", 2048))
-    SANDBOX_MAX_CPU_PERCENT = int(os.getenv("SANDBOX_MAX_CPU_PERCENT", 80))
-    SANDBOX_PYTHON_EXECUTABLE = os.getenv("SANDBOX_PYTHON_EXECUTABLE", sys.executable)
+    SANDBOX_TIMEOUT: int
+    SANDBOX_MAX_MEMORY_MB: int
+    SANDBOX_MAX_CPU_PERCENT: int
+    SANDBOX_PYTHON_EXECUTABLE: str
     
     # Security
-    SECRET_KEY = os.getenv("SECRET_KEY", "change-this-in-production")
+    SECRET_KEY: str
     
     # Strategy Refinement
-    MAX_REFINEMENT_ITERATIONS = 3
+    MAX_REFINEMENT_ITERATIONS: int
+    
+    # Analyses run at once by the web server; further requests wait their turn
+    MAX_CONCURRENT_ANALYSES: int
     
     # Agent Prompts Directory
-    PROMPTS_DIR = BASE_DIR / "src" / "prompts"
-    PROMPTS_DIR.mkdir(exist_ok=True)
+    PROMPTS_DIR: Path
+    
+    @classmethod
+    def load(cls) -> "Config":
+        """Build the configuration from environment variables"""
+        base_dir = Path(__file__).parent.parent
+        default_llm_provider = os.getenv("DEFAULT_LLM_PROVIDER", "siliconflow")
+        default_model = os.getenv("DEFAULT_MODEL", "deepseek-ai/DeepSeek-V3.1-Terminus")
+        return cls(
+            OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", ""),
+            ANTHROPIC_API_KEY=os.getenv("ANTHROPIC_API_KEY", ""),
+            SILICONFLOW_API_KEY=os.getenv("SILICONFLOW_API_KEY", ""),
+            SILICONFLOW_API_ENDPOINT=os.getenv("SILICONFLOW_API_ENDPOINT", "https://api.siliconflow.cn/v1/chat/completions"),
+            SILICONFLOW_MODEL=os.getenv("SILICONFLOW_MODEL", "deepseek-ai/DeepSeek-V3.1-Terminus"),
+            SILICONFLOW_MAX_CONNECTIONS=_env_int("SILICONFLOW_MAX_CONNECTIONS", 2000),
+            SILICONFLOW_MAX_KEEPALIVE=_env_int("SILICONFLOW_MAX_KEEPALIVE", 1000),
+            DEFAULT_LLM_PROVIDER=default_llm_provider,
+            DEFAULT_MODEL=default_model,
+            CODE_LLM_PROVIDER=os.getenv("CODE_LLM_PROVIDER", default_llm_provider),
+            CODE_LLM_MODEL=os.getenv("CODE_LLM_MODEL", default_model),
+            LLM_MAX_TOKENS=_env_int("LLM_MAX_TOKENS", 4096),
+            LLM_CODE_MAX_TOKENS=_env_int("LLM_CODE_MAX_TOKENS", 2048),
+            HOST=os.getenv("HOST", "0.0.0.0"),
+            PORT=_env_int("PORT", 8000),
+            SERVER_WORKERS=_env_int("SERVER_WORKERS", 1),
+            SERVER_RELOAD=os.getenv("SERVER_RELOAD", "false").lower() in ("1", "true", "yes"),
+            BASE_DIR=base_dir,
+            WORKSPACE_ROOT=Path(os.getenv("WORKSPACE_ROOT", base_dir / "workspaces")),
+            SANDBOX_TIMEOUT=_env_int("SANDBOX_TIMEOUT", 300),
+            SANDBOX_MAX_MEMORY_MB=_env_int("SANDBOX_MAX_MEMORY_MB", 2048),
+            SANDBOX_MAX_CPU_PERCENT=_env_int("SANDBOX_MAX_CPU_PERCENT", 80),
+            SANDBOX_PYTHON_EXECUTABLE=os.getenv("SANDBOX_PYTHON_EXECUTABLE", sys.executable),
+            SECRET_KEY=os.getenv("SECRET_KEY", "change-this-in-production"),
+            MAX_REFINEMENT_ITERATIONS=3,
+            MAX_CONCURRENT_ANALYSES=_env_int("MAX_CONCURRENT_ANALYSES", 4),
+            PROMPTS_DIR=base_dir / "src" / "prompts"
+        )
+    
+    def ensure_dirs(self):
+        """Create the workspace and prompts directories (kept off the import path)"""
+        self.WORKSPACE_ROOT.mkdir(exist_ok=True)
+        self.PROMPTS_DIR.mkdir(exist_ok=True)
     
     def get_api_key(self, provider: str) -> str:
         """Get API key for specified provider"""
-        if provider == "openai":
-            return self.OPENAI_API_KEY
-        elif provider == "anthropic":
-            return self.ANTHROPIC_API_KEY
-        elif provider == "siliconflow":
-            return self.SILICONFLOW_API_KEY
-        else:
+        attr = _PROVIDER_KEY_ATTR.get(provider)
+        if attr is None:
             raise ValueError(f"Unknown provider: {provider}")
+        return getattr(self, attr)
 
 
-config = Config()
+config = Config.load()
@@ -0,0 +1,81 @@
+"""
+In-process cache of deterministic (temperature=0) LLM responses
+
+Opt-in: only chat_completion calls made with temperature=0 use it. The agents
+currently sample at 0.7 (the Python sandbox at 0.2), so nothing in the tree
+hits it yet.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import copy
+import hashlib
+import json
+import time
+
+
+class LLMCache:
+    """LRU cache with a time-to-live, keyed by a hash of the request payload"""
+    
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> (expiry time, response); all access happens on the event loop
+        # thread without awaiting in between, so no lock is needed
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        tool_names: List[str],
+        max_tokens: int
+    ) -> str:
+        """Hash the canonical JSON form of a request"""
+        payload = json.dumps(
+            {
+                "provider": provider,
+                "model": model,
+                "messages": messages,
+                "tools": tool_names,
+                "max_tokens": max_tokens
+            },
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached response, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(entry[1])
+    
+    def set(self, key: str, response: Dict[str, Any]):
+        """Store a copy of a response, evicting the least recently used entry when full"""
+        self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(response))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all entries and reset the statistics"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+llm_cache = LLMCache()
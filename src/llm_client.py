@@ -1,19 +1,249 @@
 """
 LLM Client with support for multiple providers
 """
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator, Awaitable, Iterator, Tuple
 import openai
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 from src.config import config
+from src.llm_cache import llm_cache
 from src.mcp.protocol import ToolDefinition
+import httpx
 import json
-import requests
 import asyncio
+import contextlib
 import logging
+import random
 import re
 
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to stdlib json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Response bodies, stream chunks and tool arguments are parsed in C when orjson
+# is available (its JSONDecodeError subclasses the stdlib one)
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Text-based tool calls: a ```json code block, or a bare object with "action": "tool_call"
+_JSON_BLOCK_RE = re.compile(r'```json\s*(\{[\s\S]*?\})\s*```')
+# Characters that matter when matching braces in JSON
+_JSON_STRUCTURE_RE = re.compile(r'[{}"\\]')
+
+# Appended to the last user message when tools are described in text
+_TOOL_INSTRUCTION_TEMPLATE = """
+
+You have access to the following tools. To use a tool, respond with JSON in this EXACT format:
+```json
+{{
+  "action": "tool_call",
+  "tool": "tool_name",
+  "arguments": {{
+    "arg1": "value1",
+    "arg2": "value2"
+  }}
+}}
+```
+
+Available tools:
+{tool_descriptions}
+
+IMPORTANT: 
+- Always use the exact JSON format shown above
+- Put the JSON in a code block with ```json
+- After using a tool, you'll receive the result and can continue reasoning
+"""
+
+# SiliconFlow models that accept OpenAI-style `tools`; every other model is given
+# the tool descriptions in text and answers with JSON tool calls
+_TOOLS_API_SUPPORTED_MODELS = frozenset({
+    "Qwen/Qwen2.5-7B-Instruct",
+    "Qwen/Qwen2.5-14B-Instruct",
+    "Qwen/Qwen2.5-32B-Instruct",
+    "Qwen/Qwen2.5-72B-Instruct",
+    "Qwen/Qwen2.5-Coder-32B-Instruct",
+    "Qwen/Qwen3-8B",
+    "Qwen/Qwen3-14B",
+    "Qwen/Qwen3-32B",
+    "Qwen/Qwen3-30B-A3B",
+    "Qwen/Qwen3-235B-A22B",
+    "Qwen/Qwen3-Coder-30B-A3B-Instruct",
+    "Qwen/Qwen3-Coder-480B-A35B-Instruct",
+    "THUDM/glm-4-9b-chat",
+    "zai-org/GLM-4.5",
+    "moonshotai/Kimi-K2-Instruct"
+})
+
+# Transient HTTP statuses retried with exponential backoff, and how many times
+_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRIES = 5
+
+# Anthropic only caches prefixes of at least 1024 tokens; at roughly 4 characters
+# per token, shorter system prompts are sent without a cache breakpoint
+_MIN_CACHEABLE_PROMPT_CHARS = 4096
+
+# Distinct tool sets remembered per client before the conversion caches are reset
+_TOOL_FORMAT_CACHE_SIZE = 64
+
+# Shared by every LLM call in the process (SiliconFlow directly, OpenAI and
+# Anthropic through their async SDKs), so concurrent requests reuse pooled
+# keep-alive (HTTP/2) connections instead of paying a handshake each time
+_HTTPX_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _get_httpx_client() -> httpx.AsyncClient:
+    """Get the process-wide async HTTP client, creating it on first use"""
+    global _HTTPX_CLIENT
+    if _HTTPX_CLIENT is None:
+        _HTTPX_CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.SILICONFLOW_MAX_CONNECTIONS,
+                max_keepalive_connections=config.SILICONFLOW_MAX_KEEPALIVE
+            ),
+            timeout=httpx.Timeout(connect=10, read=120, write=30, pool=5),
+            http2=True
+        )
+    return _HTTPX_CLIENT
+
+
+def _iter_balanced_objects(text: str) -> Iterator[str]:
+    """
+    Yield each top-level {...} span of text whose braces balance, ignoring
+    braces inside JSON strings. Scans forward once, jumping between structural
+    characters; a "{" that never closes is skipped and scanning resumes after it.
+    """
+    start = text.find("{")
+    while start != -1:
+        depth = 0
+        in_string = False
+        pos = start
+        end = -1
+        while True:
+            match = _JSON_STRUCTURE_RE.search(text, pos)
+            if match is None:
+                break
+            char = match.group()
+            pos = match.end()
+            if in_string:
+                if char == "\\":
+                    pos += 1  # skip the escaped character
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    end = pos
+                    break
+        
+        if end == -1:
+            start = text.find("{", start + 1)
+        else:
+            yield text[start:end]
+            start = text.find("{", end)
+
+
+def _dedup_messages(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Drop byte-identical repeats that only cost prompt tokens: a system message
+    already sent earlier in the list, and a user/tool message that repeats the
+    message right before it. Assistant turns and anything interleaved with them
+    are kept. Returns the original list when nothing is dropped.
+    """
+    deduped = None
+    seen_system = set()
+    previous = None
+    for i, msg in enumerate(messages):
+        role = msg.get("role")
+        content = msg.get("content")
+        key = (role, content)
+        duplicate = isinstance(content, str) and (
+            key in seen_system if role == "system"
+            else role in ("user", "tool") and key == previous
+        )
+        if duplicate:
+            if deduped is None:
+                deduped = list(messages[:i])
+            continue
+        if role == "system" and isinstance(content, str):
+            seen_system.add(key)
+        previous = key
+        if deduped is not None:
+            deduped.append(msg)
+    return messages if deduped is None else deduped
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After if given, else jittered exponential backoff"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(60.0, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    return min(60.0, 2 ** attempt + random.random())
+
+
+async def _iter_sse_chunks(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the JSON chunks of an OpenAI-style server-sent event stream"""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        yield _json_loads(data)
+
+
+async def _read_sse_completion(
+    response: httpx.Response,
+    on_delta: Optional[Callable[[str], None]] = None
+) -> Tuple[str, List[Dict[str, str]], str]:
+    """
+    Accumulate a streamed chat completion.
+    
+    Returns (content, tool calls as {"name", "arguments" JSON string}, finish_reason).
+    """
+    content_parts = []
+    tool_calls: Dict[int, Dict[str, Any]] = {}
+    finish_reason = "stop"
+    async for chunk in _iter_sse_chunks(response):
+        if not chunk.get("choices"):
+            continue
+        choice = chunk["choices"][0]
+        delta = choice.get("delta") or {}
+        
+        text = delta.get("content")
+        if text:
+            content_parts.append(text)
+            if on_delta is not None:
+                on_delta(text)
+        
+        # Tool calls arrive as fragments addressed by index
+        for call in delta.get("tool_calls") or []:
+            entry = tool_calls.setdefault(call.get("index", 0), {"name": "", "arguments": []})
+            function = call.get("function") or {}
+            if function.get("name"):
+                entry["name"] += function["name"]
+            if function.get("arguments"):
+                entry["arguments"].append(function["arguments"])
+        
+        if choice.get("finish_reason"):
+            finish_reason = choice["finish_reason"]
+    
+    return (
+        "".join(content_parts),
+        [
+            {"name": call["name"], "arguments": "".join(call["arguments"]) or "{}"}
+            for _, call in sorted(tool_calls.items())
+        ],
+        finish_reason
+    )
+
 
 class LLMClient:
     """Unified LLM client supporting multiple providers"""
@@ -29,23 +259,76 @@ class LLMClient:
         
         if self.provider == "openai":
             self.api_key = api_key or config.OPENAI_API_KEY
-            openai.api_key = self.api_key
-            self.client = openai
+            self.client = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                http_client=_get_httpx_client(),
+                max_retries=_MAX_RETRIES
+            )
         elif self.provider == "anthropic":
             self.api_key = api_key or config.ANTHROPIC_API_KEY
-            self.client = Anthropic(api_key=self.api_key)
+            self.client = AsyncAnthropic(
+                api_key=self.api_key,
+                http_client=_get_httpx_client(),
+                max_retries=_MAX_RETRIES
+            )
         elif self.provider == "siliconflow":
             self.api_key = api_key or config.SILICONFLOW_API_KEY
             self.api_endpoint = config.SILICONFLOW_API_ENDPOINT
-            self.client = None  # We'll use requests directly
+            self.client = None  # We'll use the shared httpx client directly
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
+        
+        # Bound once, so chat_completion dispatches without comparing provider names
+        self._completion_fn: Callable[..., Awaitable[Dict[str, Any]]] = {
+            "openai": self._openai_completion,
+            "anthropic": self._anthropic_completion,
+            "siliconflow": self._siliconflow_completion
+        }[self.provider]
+        
+        # Converted tool lists, keyed by the identity of the tool definitions
+        self._tools_format_cache: Dict[Tuple[int, ...], Tuple[Tuple[ToolDefinition, ...], Any]] = {}
+        self._tools_text_cache: Dict[Tuple[int, ...], Tuple[Tuple[ToolDefinition, ...], Any]] = {}
+    
+    @classmethod
+    async def aclose(cls):
+        """Close the shared HTTP connection pool (call once on shutdown)"""
+        global _HTTPX_CLIENT
+        if _HTTPX_CLIENT is not None:
+            client, _HTTPX_CLIENT = _HTTPX_CLIENT, None
+            await client.aclose()
+    
+    @staticmethod
+    def _cached_tool_format(
+        cache: Dict[Tuple[int, ...], Tuple[Tuple[ToolDefinition, ...], Any]],
+        tools: List[ToolDefinition],
+        build: Callable[[List[ToolDefinition]], Any]
+    ) -> Any:
+        """
+        Return build(tools), reusing the result for the same tool definitions.
+        
+        Agents pass the registry's cached definitions on every turn, so identity is
+        a cheap key. The entry holds the definitions, so their ids can't be reused.
+        """
+        key = tuple(map(id, tools))
+        entry = cache.get(key)
+        if entry is None:
+            if len(cache) >= _TOOL_FORMAT_CACHE_SIZE:
+                cache.clear()
+            entry = cache[key] = (tuple(tools), build(tools))
+        return entry[1]
     
     def _convert_tools_to_openai_format(
         self,
         tools: List[ToolDefinition]
     ) -> List[Dict[str, Any]]:
-        """Convert MCP tool definitions to OpenAI function format"""
+        """Convert MCP tool definitions to OpenAI function format (cached per tool set)"""
+        return self._cached_tool_format(
+            self._tools_format_cache, tools, self._build_openai_tools
+        )
+    
+    @staticmethod
+    def _build_openai_tools(tools: List[ToolDefinition]) -> List[Dict[str, Any]]:
+        """Build the OpenAI function definitions for a tool list"""
         openai_tools = []
         for tool in tools:
             properties = {}
@@ -90,7 +373,9 @@ class LLMClient:
         messages: List[Dict[str, str]],
         tools: Optional[List[ToolDefinition]] = None,
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        no_cache: bool = False,
+        on_delta: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
         """
         Generate chat completion with optional tool calling
@@ -99,33 +384,260 @@ class LLMClient:
             {
                 "content": str,
                 "tool_calls": [{"name": str, "arguments": dict}],
-                "finish_reason": str
+                "finish_reason": str,
+                "usage": {  # OpenAI/Anthropic only
+                    "input_tokens": int,
+                    "output_tokens": int,
+                    "cache_creation_input_tokens": int,
+                    "cache_read_input_tokens": int
+                }
             }
+        
+        Leading system messages are sent as the system prompt; on Anthropic the
+        first one is marked for prompt caching (if over ~4096 characters, about
+        the 1024-token minimum), so it should be the static part.
+        
+        temperature=0 responses are cached in-process and replayed for identical
+        requests; pass no_cache=True to force a fresh generation.
+        
+        Repeated system messages and back-to-back identical user/tool messages
+        are dropped before sending.
+        
+        on_delta, if given, is called with each piece of content as it arrives.
+        Only SiliconFlow is streamed here; other providers (and cache hits)
+        deliver the whole content as a single delta.
         """
         if max_tokens is None:
             max_tokens = config.LLM_MAX_TOKENS
+        
+        messages = _dedup_messages(messages)
+        
+        cache_key = None
+        if temperature == 0 and not no_cache:
+            cache_key = llm_cache.make_key(
+                self.provider, self.model, messages,
+                [tool.name for tool in tools or []], max_tokens
+            )
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("LLM cache hit: %s", llm_cache.stats)
+                if on_delta is not None and cached["content"]:
+                    on_delta(cached["content"])
+                return cached
 
+        result = await self._completion_fn(
+            messages, tools, temperature, max_tokens, on_delta
+        )
+        
+        if cache_key is not None:
+            llm_cache.set(cache_key, result)
+        return result
+    
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate a plain-text chat completion (no tool calling), yielding content
+        deltas as they arrive. Closing the generator early closes the connection,
+        so the rest of the response is not generated.
+        """
+        if max_tokens is None:
+            max_tokens = config.LLM_MAX_TOKENS
+        
         if self.provider == "openai":
-            return await self._openai_completion(
-                messages, tools, temperature, max_tokens
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
             )
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.response.aclose()
         elif self.provider == "anthropic":
-            return await self._anthropic_completion(
-                messages, tools, temperature, max_tokens
-            )
+            kwargs = self._anthropic_request_kwargs(messages, temperature, max_tokens)
+            stream = await self.client.messages.create(stream=True, **kwargs)
+            try:
+                async for event in stream:
+                    if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                        yield event.delta.text
+            finally:
+                await stream.response.aclose()
         elif self.provider == "siliconflow":
-            return await self._siliconflow_completion(
-                messages, tools, temperature, max_tokens
+            payload, _ = self._siliconflow_payload(messages, None, temperature, max_tokens)
+            async with self._siliconflow_stream(payload) as response:
+                if response.status_code != 200:
+                    error_detail = (await response.aread()).decode(errors="replace")
+                    raise Exception(f"SiliconFlow API error: {response.status_code} - {error_detail}")
+                async for chunk in _iter_sse_chunks(response):
+                    if chunk.get("choices"):
+                        text = (chunk["choices"][0].get("delta") or {}).get("content")
+                        if text:
+                            yield text
+    
+    async def chat_completion_candidates(
+        self,
+        messages: List[Dict[str, str]],
+        n: int,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> List[str]:
+        """
+        Sample n plain-text completions (no tool calling) for the same messages.
+        
+        OpenAI returns all candidates from one request (n=...); other providers
+        get n concurrent requests sharing the same (cacheable) prompt prefix.
+        Failed requests are dropped, so fewer than n contents may be returned.
+        """
+        if max_tokens is None:
+            max_tokens = config.LLM_MAX_TOKENS
+        
+        if self.provider == "openai":
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                n=n
             )
+            return [choice.message.content or "" for choice in response.choices]
+        
+        results = await asyncio.gather(
+            *(self.chat_completion(messages, None, temperature, max_tokens) for _ in range(n)),
+            return_exceptions=True
+        )
+        contents = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning("Candidate completion failed: %s", result)
+            else:
+                contents.append(result["content"])
+        return contents
+    
+    async def chat_completion_batch(
+        self,
+        batch: List[List[Dict[str, str]]],
+        tools: Optional[List[ToolDefinition]] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        concurrency: int = 32
+    ) -> List[Dict[str, Any]]:
+        """
+        Run chat_completion for many independent conversations, at most
+        `concurrency` at a time, returning results in input order.
+        
+        The requests overlap on the shared async connection pool, so throughput
+        scales with concurrency up to the provider's rate limit. The first
+        failure is raised once all requests have settled.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _one(messages: List[Dict[str, str]]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.chat_completion(messages, tools, temperature, max_tokens)
+        
+        results = await asyncio.gather(
+            *(_one(messages) for messages in batch),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+    
+    async def submit_batch(self, requests: List[Dict[str, Any]]) -> str:
+        """
+        Submit chat completions to the OpenAI Batch API (half price, completed
+        within 24h, outside the realtime rate limit). Each request holds
+        chat.completions.create arguments; "model" defaults to this client's.
+        
+        Returns the batch id for poll_batch().
+        """
+        if self.provider != "openai":
+            raise ValueError(f"Batch API is not supported for provider: {self.provider}")
+        
+        lines = [
+            json.dumps({
+                "custom_id": f"request-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"model": self.model, **request}
+            })
+            for i, request in enumerate(requests)
+        ]
+        batch_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info("Submitted batch %s with %d requests", batch.id, len(requests))
+        return batch.id
+    
+    async def poll_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = 30.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Wait for a batch from submit_batch() to finish and return its results in
+        request order, each as {"content", "finish_reason", "usage"} or {"error"}.
+        """
+        batch = await self.client.batches.retrieve(batch_id)
+        while batch.status in ("validating", "in_progress", "finalizing"):
+            await asyncio.sleep(poll_interval)
+            batch = await self.client.batches.retrieve(batch_id)
+        
+        if batch.status != "completed":
+            raise Exception(f"Batch {batch_id} ended with status: {batch.status}")
+        
+        results: Dict[int, Dict[str, Any]] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                record = _json_loads(line)
+                index = int(record["custom_id"].rsplit("-", 1)[1])
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code") != 200:
+                    results[index] = {"error": record.get("error") or response.get("body")}
+                    continue
+                body = response["body"]
+                choice = body["choices"][0]
+                results[index] = {
+                    "content": choice["message"].get("content") or "",
+                    "finish_reason": choice.get("finish_reason"),
+                    "usage": body.get("usage", {})
+                }
+        
+        total = batch.request_counts.total if batch.request_counts else len(results)
+        return [
+            results.get(i, {"error": "missing from batch output"})
+            for i in range(total)
+        ]
     
     async def _openai_completion(
         self,
         messages: List[Dict[str, str]],
         tools: Optional[List[ToolDefinition]],
         temperature: float,
-        max_tokens: int
+        max_tokens: int,
+        on_delta: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
-        """OpenAI completion"""
+        """OpenAI completion (not streamed; on_delta gets the whole content once)"""
         kwargs = {
             "model": self.model,
             "messages": messages,
@@ -137,37 +649,49 @@ class LLMClient:
             kwargs["tools"] = self._convert_tools_to_openai_format(tools)
             kwargs["tool_choice"] = "auto"
         
-        response = self.client.chat.completions.create(**kwargs)
+        response = await self.client.chat.completions.create(**kwargs)
         message = response.choices[0].message
         
-        logger.info(f"LLM response (OpenAI): {message.content[:50]}")
+        usage = response.usage
+        cached_details = getattr(usage, "prompt_tokens_details", None)
         result = {
             "content": message.content or "",
             "tool_calls": [],
-            "finish_reason": response.choices[0].finish_reason
+            "finish_reason": response.choices[0].finish_reason,
+            "usage": {
+                "input_tokens": usage.prompt_tokens,
+                "output_tokens": usage.completion_tokens,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": getattr(cached_details, "cached_tokens", None) or 0
+            }
         }
+        logger.info("LLM response (OpenAI): %s", result["content"][:50])
+        logger.debug("OpenAI usage: %s", result["usage"])
         
         if message.tool_calls:
             for tool_call in message.tool_calls:
                 result["tool_calls"].append({
                     "name": tool_call.function.name,
-                    "arguments": json.loads(tool_call.function.arguments)
+                    "arguments": _json_loads(tool_call.function.arguments)
                 })
         
+        if on_delta is not None and result["content"]:
+            on_delta(result["content"])
         return result
     
-    async def _anthropic_completion(
+    def _anthropic_request_kwargs(
         self,
         messages: List[Dict[str, str]],
-        tools: Optional[List[ToolDefinition]],
         temperature: float,
         max_tokens: int
     ) -> Dict[str, Any]:
-        """Anthropic completion"""
-        # Extract system message if present
-        system_message = None
-        if messages and messages[0]["role"] == "system":
-            system_message = messages[0]["content"]
+        """Build Anthropic messages.create arguments from chat-style messages"""
+        # Leading system messages become system blocks. The first one (the agent's
+        # static prompt) is marked cacheable, when long enough to qualify, so
+        # repeated calls only pay full price for what follows it.
+        system_blocks = []
+        while messages and messages[0]["role"] == "system":
+            system_blocks.append({"type": "text", "text": messages[0]["content"]})
             messages = messages[1:]
         
         kwargs = {
@@ -177,62 +701,99 @@ class LLMClient:
             "max_tokens": max_tokens
         }
         
-        if system_message:
-            kwargs["system"] = system_message
+        if system_blocks:
+            if len(system_blocks[0]["text"]) > _MIN_CACHEABLE_PROMPT_CHARS:
+                system_blocks[0]["cache_control"] = {"type": "ephemeral"}
+            kwargs["system"] = system_blocks
+        
+        return kwargs
+    
+    async def _anthropic_completion(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[ToolDefinition]],
+        temperature: float,
+        max_tokens: int,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """Anthropic completion (not streamed; on_delta gets the whole content once)"""
+        kwargs = self._anthropic_request_kwargs(messages, temperature, max_tokens)
         
         # Note: Anthropic has different tool calling format
         # For simplicity, we'll implement basic version
         # Production would need full Anthropic tools API
         
-        response = self.client.messages.create(**kwargs)
+        response = await self.client.messages.create(**kwargs)
         
-        logger.info(f"LLM response (Anthropic): {(response.content[0].text if response.content else '')[:50]}")
+        usage = response.usage
         result = {
             "content": response.content[0].text if response.content else "",
             "tool_calls": [],
-            "finish_reason": response.stop_reason
+            "finish_reason": response.stop_reason,
+            "usage": {
+                "input_tokens": usage.input_tokens,
+                "output_tokens": usage.output_tokens,
+                "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+                "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0
+            }
         }
+        logger.info("LLM response (Anthropic): %s", result["content"][:50])
+        logger.debug("Anthropic usage: %s", result["usage"])
         
+        if on_delta is not None and result["content"]:
+            on_delta(result["content"])
         return result
     
-    async def _siliconflow_completion(
+    def _siliconflow_payload(
         self,
         messages: List[Dict[str, str]],
         tools: Optional[List[ToolDefinition]],
         temperature: float,
         max_tokens: int
-    ) -> Dict[str, Any]:
-        """SiliconFlow completion (OpenAI-compatible API with text-based tool calling fallback)"""
-        import asyncio
-        import re
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # For DeepSeek models that don't support tool calling API,
-        # we'll use text-based tool calling instead
-        use_text_based_tools = "deepseek" in self.model.lower() and tools
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Build the SiliconFlow request body; also returns whether tools are described in text"""
+        # Models not known to support the tool calling API (DeepSeek among them)
+        # get text-based tool calling, decided up front rather than by a failed request
+        use_text_based_tools = bool(tools) and self.model not in _TOOLS_API_SUPPORTED_MODELS
         
         # Convert any "tool" role messages to "user" role for compatibility
         # Many models don't support the "tool" role
-        modified_messages = []
-        for msg in messages:
-            if msg.get("role") == "tool":
-                modified_messages.append({
-                    "role": "user",
-                    "content": f"[Tool Result]\n{msg['content']}"
-                })
-            else:
-                modified_messages.append(msg)
+        # Consecutive leading system messages are merged, since some chat templates
+        # accept only a single system message
+        # The usual case needs neither, and then the caller's list is sent as is
+        needs_rewrite = (
+            len(messages) > 1
+            and messages[0].get("role") == "system"
+            and messages[1].get("role") == "system"
+        ) or any(msg.get("role") == "tool" for msg in messages)
+        if needs_rewrite:
+            modified_messages = []
+            for msg in messages:
+                if (
+                    msg.get("role") == "system"
+                    and len(modified_messages) == 1
+                    and modified_messages[0]["role"] == "system"
+                ):
+                    modified_messages[0] = {
+                        "role": "system",
+                        "content": modified_messages[0]["content"] + "\n\n" + msg["content"]
+                    }
+                elif msg.get("role") == "tool":
+                    modified_messages.append({
+                        "role": "user",
+                        "content": f"[Tool Result]\n{msg['content']}"
+                    })
+                else:
+                    modified_messages.append(msg)
+        else:
+            modified_messages = messages
         
         payload = {
             "model": self.model,
             "messages": modified_messages,
             "temperature": temperature,
             "max_tokens": max_tokens,
-            "stream": False
+            "stream": True
         }
         
         if use_text_based_tools:
@@ -240,94 +801,77 @@ class LLMClient:
             tool_descriptions = self._format_tools_as_text(tools)
             
             # Add tool calling instructions
-            tool_instruction = f"""
-
-You have access to the following tools. To use a tool, respond with JSON in this EXACT format:
-```json
-{{
-  "action": "tool_call",
-  "tool": "tool_name",
-  "arguments": {{
-    "arg1": "value1",
-    "arg2": "value2"
-  }}
-}}
-```
-
-Available tools:
-{tool_descriptions}
-
-IMPORTANT: 
-- Always use the exact JSON format shown above
-- Put the JSON in a code block with ```json
-- After using a tool, you'll receive the result and can continue reasoning
-"""
+            tool_instruction = _TOOL_INSTRUCTION_TEMPLATE.format(tool_descriptions=tool_descriptions)
             
-            # Add to last user message or create system message
+            # Add to last user message or create system message (as a new list and
+            # dict, since either may be the caller's own)
             if modified_messages and modified_messages[-1]["role"] == "user":
-                modified_messages[-1]["content"] = modified_messages[-1]["content"] + tool_instruction
+                modified_messages = modified_messages[:-1] + [{
+                    **modified_messages[-1],
+                    "content": modified_messages[-1]["content"] + tool_instruction
+                }]
             
             payload["messages"] = modified_messages
-            logger.debug(f"Using text-based tool calling for {len(tools)} tools")
+            logger.debug("Using text-based tool calling for %d tools", len(tools))
             ##for tool in tools:
             ##   logger.debug(f" - {tool.name}: {tool.description}")
         else:
-            # Try standard tool calling API (for models that support it)
+            # Standard tool calling API (for models that support it)
             if tools:
                 try:
                     openai_tools = self._convert_tools_to_openai_format(tools)
                     payload["tools"] = openai_tools
                     payload["tool_choice"] = "auto"
-                    logger.debug(f"Using API-based tool calling for {len(tools)} tools")
+                    logger.debug("Using API-based tool calling for %d tools", len(tools))
                 except Exception as e:
-                    logger.warning(f"Could not format tools: {e}")
+                    logger.warning("Could not format tools: %s", e)
+        
+        return payload, use_text_based_tools
+    
+    async def _siliconflow_completion(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[ToolDefinition]],
+        temperature: float,
+        max_tokens: int,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """SiliconFlow completion (OpenAI-compatible API with text-based tool calling fallback)"""
+        payload, use_text_based_tools = self._siliconflow_payload(
+            messages, tools, temperature, max_tokens
+        )
         
-        # Make request
-        loop = asyncio.get_event_loop()
+        # Make request; the response is streamed (SSE) so content reaches
+        # on_delta as it is generated
         try:
-            response = await loop.run_in_executor(
-                None,
-                lambda: requests.post(
-                    self.api_endpoint,
-                    headers=headers,
-                    json=payload,
-                    timeout=120
-                )
-            )
+            async with self._siliconflow_stream(payload) as response:
+                if response.status_code == 200:
+                    content, api_tool_calls, finish_reason = await _read_sse_completion(
+                        response, on_delta
+                    )
+                else:
+                    error_detail = (await response.aread()).decode(errors="replace")
         except Exception as e:
-            logger.error(f"Request failed: {e}")
+            logger.error("Request failed: %s", e)
             raise
         
         if response.status_code != 200:
-            error_detail = response.text
-            logger.error(f"SiliconFlow API error {response.status_code}: {error_detail}")
-            
-            # If tool calling API failed and we haven't tried text-based yet
-            if response.status_code == 400 and tools and not use_text_based_tools:
-                logger.warning("API tool calling failed, retrying with text-based approach")
-                return await self._siliconflow_completion(
-                    messages, tools, temperature, max_tokens
-                )
-            
+            logger.error("SiliconFlow API error %s: %s", response.status_code, error_detail)
             raise Exception(f"SiliconFlow API error: {response.status_code} - {error_detail}")
         
-        data = response.json()
-        message = data["choices"][0]["message"]
-        content = message.get("content") or ""
-        
-        logger.info(f"LLM response (SiliconFlow): {content[:50]}")
+        logger.info("LLM response (SiliconFlow): %s", content[:50])
         result = {
             "content": content,
             "tool_calls": [],
-            "finish_reason": data["choices"][0].get("finish_reason", "stop")
+            "finish_reason": finish_reason
         }
         
         # Parse tool calls from API response (standard format)
-        if message.get("tool_calls"):
-            for tool_call in message["tool_calls"]:
+        if api_tool_calls:
+            for tool_call in api_tool_calls:
                 result["tool_calls"].append({
-                    "name": tool_call["function"]["name"],
-                    "arguments": json.loads(tool_call["function"]["arguments"])
+                    "name": tool_call["name"],
+                    "arguments": _json_loads(tool_call["arguments"])
                 })
         
         # Parse text-based tool calls (for DeepSeek and others)
@@ -335,12 +879,50 @@ IMPORTANT:
             parsed_tools = self._parse_text_tool_calls(content)
             if parsed_tools:
                 result["tool_calls"] = parsed_tools
-                logger.debug(f"Parsed {len(parsed_tools)} tool calls from text response")
+                logger.debug("Parsed %d tool calls from text response", len(parsed_tools))
         
         return result
     
+    @contextlib.asynccontextmanager
+    async def _siliconflow_stream(self, payload: Dict[str, Any]) -> AsyncIterator[httpx.Response]:
+        """
+        Open a streamed SiliconFlow request, retrying transient errors (429/5xx)
+        with backoff. Yields the response, which may still carry an error status.
+        """
+        client = _get_httpx_client()
+        for attempt in range(_MAX_RETRIES + 1):
+            async with client.stream(
+                "POST",
+                self.api_endpoint,
+                headers=self._siliconflow_headers(),
+                json=payload
+            ) as response:
+                if response.status_code not in _RETRY_STATUS_CODES or attempt == _MAX_RETRIES:
+                    yield response
+                    return
+                delay = _retry_delay(response, attempt)
+            logger.warning(
+                "SiliconFlow API returned %s, retrying in %.1fs (attempt %d/%d)",
+                response.status_code, delay, attempt + 1, _MAX_RETRIES
+            )
+            await asyncio.sleep(delay)
+    
+    def _siliconflow_headers(self) -> Dict[str, str]:
+        """Request headers for the SiliconFlow API"""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+    
     def _format_tools_as_text(self, tools: List[ToolDefinition]) -> str:
-        """Format tool definitions as human-readable text"""
+        """Format tool definitions as human-readable text (cached per tool set)"""
+        return self._cached_tool_format(
+            self._tools_text_cache, tools, self._build_tools_text
+        )
+    
+    @staticmethod
+    def _build_tools_text(tools: List[ToolDefinition]) -> str:
+        """Build the human-readable description of a tool list"""
         lines = []
         for tool in tools:
             lines.append(f"\n{tool.name}:")
@@ -353,39 +935,41 @@ IMPORTANT:
     
     def _parse_text_tool_calls(self, content: str) -> List[Dict[str, Any]]:
         """Parse tool calls from text response in JSON format"""
+        # Every tool call carries "action": "tool_call"; most responses have none
+        if '"tool_call"' not in content:
+            return []
+        
         tool_calls = []
         
         # Look for JSON code blocks
-        json_pattern = r'```json\s*(\{[\s\S]*?\})\s*```'
-        matches = re.findall(json_pattern, content)
+        matches = _JSON_BLOCK_RE.findall(content)
         
         for match in matches:
             try:
-                data = json.loads(match)
+                data = _json_loads(match)
                 if data.get("action") == "tool_call" and "tool" in data and "arguments" in data:
                     tool_calls.append({
                         "name": data["tool"],
                         "arguments": data["arguments"]
                     })
             except json.JSONDecodeError as e:
-                logger.warning(f"Failed to parse tool call JSON: {e}")
+                logger.warning("Failed to parse tool call JSON: %s", e)
                 continue
         
-        # Also look for plain JSON (without code blocks)
+        # Also look for plain JSON (without code blocks), which may be nested
         if not tool_calls:
-            try:
-                # Try to find JSON object in the content
-                json_obj_pattern = r'\{[^{}]*"action"\s*:\s*"tool_call"[^{}]*\}'
-                matches = re.findall(json_obj_pattern, content)
-                for match in matches:
-                    data = json.loads(match)
-                    if "tool" in data and "arguments" in data:
-                        tool_calls.append({
-                            "name": data["tool"],
-                            "arguments": data["arguments"]
-                        })
-            except:
-                pass
+            for obj_str in _iter_balanced_objects(content):
+                if '"tool_call"' not in obj_str:
+                    continue
+                try:
+                    data = _json_loads(obj_str)
+                except json.JSONDecodeError:
+                    continue
+                if data.get("action") == "tool_call" and "tool" in data and "arguments" in data:
+                    tool_calls.append({
+                        "name": data["tool"],
+                        "arguments": data["arguments"]
+                    })
         
         return tool_calls
 
@@ -7,13 +7,21 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Set, Tuple
 import asyncio
 from pathlib import Path
+import functools
 import json
+import logging
+import os
+import stat
+import time
 
 from src.workflow_engine import WorkflowEngine
 from src.config import config
+from src.llm_client import LLMClient
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="AgenticQuant - Multi-Agent Quantitative Analysis System",
@@ -33,9 +41,138 @@ app.add_middleware(
 # Initialize workflow engine
 workflow_engine = WorkflowEngine()
 
+
+@app.on_event("startup")
+async def create_directories():
+    """Create the workspace root before the first request lists or writes sessions"""
+    config.ensure_dirs()
+
+
+@app.on_event("shutdown")
+async def close_llm_connections():
+    """Close the pooled LLM HTTP connections"""
+    await LLMClient.aclose()
+
+
 # Active sessions
 active_sessions: Dict[str, Dict[str, Any]] = {}
 
+# Bounds the workflows running at once; the rest wait here in request order
+analysis_semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_ANALYSES)
+
+# WebSocket subscribers per session; each connection owns one queue of messages
+_subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+
+def _publish(session_id: str, message: Dict[str, Any]):
+    """Push a message to every WebSocket subscribed to a session"""
+    for queue in _subscribers.get(session_id, ()):
+        queue.put_nowait(message)
+
+
+def _status_message(session_id: str) -> Dict[str, Any]:
+    """WebSocket status_update message for a session"""
+    return {
+        "type": "status_update",
+        "session_id": session_id,
+        "status": active_sessions[session_id].get("status")
+    }
+
+
+def _set_session_status(session_id: str, status: str):
+    """Update a session's status and notify its subscribers"""
+    active_sessions[session_id]["status"] = status
+    _publish(session_id, _status_message(session_id))
+
+
+class _SessionProgress:
+    """Progress sink for WorkflowEngine.execute_workflow (used in place of its
+    progress_queue) that forwards each message to the session's subscribers"""
+    
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+    
+    def put_nowait(self, message: str):
+        print(message)  # still logged to the server console, as without a queue
+        _publish(self.session_id, {
+            "type": "progress",
+            "session_id": self.session_id,
+            "message": message
+        })
+
+
+async def _run_analysis(
+    session_id: str,
+    user_request: str,
+    requested_session_id: Optional[str]
+):
+    """Run a session's workflow once a slot is free"""
+    async with analysis_semaphore:
+        _set_session_status(session_id, "started")
+        return await workflow_engine.execute_workflow(
+            user_request=user_request,
+            session_id=requested_session_id,
+            progress_queue=_SessionProgress(session_id)
+        )
+
+
+def _on_workflow_done(session_id: str, task: asyncio.Task):
+    """Record how a session's workflow task ended"""
+    if task.cancelled():
+        status = "failed"
+    elif task.exception() is not None:
+        logger.error("Workflow %s failed", session_id, exc_info=task.exception())
+        status = "failed"
+    else:
+        status = task.result().status
+    _set_session_status(session_id, status)
+
+# Per-session caches for status polling. A file list is reused while the
+# workspace directory's mtime is unchanged and for at most _FILE_LIST_TTL seconds
+# (files added in subdirectories don't touch it); a plan is reused until
+# plan.json's mtime changes.
+_FILE_LIST_TTL = 3.0
+_file_list_cache: Dict[str, Tuple[int, float, List[str]]] = {}
+_plan_cache: Dict[str, Tuple[int, Optional[Dict[str, Any]]]] = {}
+
+
+def _scan_files(directory: str, prefix_len: int) -> Iterator[str]:
+    """Yield every file below directory, with the first prefix_len characters of its path removed"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # DirEntry type checks use the d_type from the directory listing, no stat
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan_files(entry.path, prefix_len)
+            elif entry.is_file():
+                yield entry.path[prefix_len:]
+
+
+def _list_session_files(session_id: str, workspace: str, mtime_ns: int) -> List[str]:
+    """Relative paths of all files in a session workspace, cached between polls"""
+    cached = _file_list_cache.get(session_id)
+    now = time.monotonic()
+    if cached is not None and cached[0] == mtime_ns and cached[1] > now:
+        return cached[2]
+    files = list(_scan_files(workspace, len(workspace) + 1))
+    _file_list_cache[session_id] = (mtime_ns, now + _FILE_LIST_TTL, files)
+    return files
+
+
+def _read_session_plan(session_id: str, plan_file: Path) -> Optional[Dict[str, Any]]:
+    """Parsed plan.json of a session (None if absent), re-read only when it changes"""
+    try:
+        mtime_ns = plan_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        _plan_cache.pop(session_id, None)
+        return None
+    cached = _plan_cache.get(session_id)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    with open(plan_file, 'r') as f:
+        plan = json.load(f)
+    _plan_cache[session_id] = (mtime_ns, plan)
+    return plan
+
 
 # Request/Response Models
 class AnalysisRequest(BaseModel):
@@ -59,6 +196,10 @@ class SessionStatus(BaseModel):
     updated_at: str
 
 
+class SessionBatchRequest(BaseModel):
+    session_ids: Optional[List[str]] = None  # None means all sessions
+
+
 # API Endpoints
 
 @app.get("/")
@@ -71,26 +212,29 @@ async def root():
 async def start_analysis(request: AnalysisRequest):
     """Start a new quantitative analysis workflow"""
     try:
-        # Start workflow in background
+        session_id = request.session_id or f"session_{len(active_sessions)}"
+        
+        # Start workflow in background (queued while MAX_CONCURRENT_ANALYSES are
+        # running); progress and the final status are pushed to WebSocket
+        # subscribers as they happen
+        status = "queued" if analysis_semaphore.locked() else "started"
         task = asyncio.create_task(
-            workflow_engine.execute_workflow(
-                user_request=request.request,
-                session_id=request.session_id
-            )
+            _run_analysis(session_id, request.request, request.session_id)
         )
+        task.add_done_callback(functools.partial(_on_workflow_done, session_id))
         
         # Store session
-        session_id = request.session_id or f"session_{len(active_sessions)}"
         active_sessions[session_id] = {
             "task": task,
-            "status": "started",
+            "status": status,
             "request": request.request
         }
+        _publish(session_id, _status_message(session_id))
         
         return AnalysisResponse(
             session_id=session_id,
-            status="started",
-            message=f"Analysis workflow started for session {session_id}"
+            status=status,
+            message=f"Analysis workflow {status} for session {session_id}"
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -99,33 +243,63 @@ async def start_analysis(request: AnalysisRequest):
 @app.get("/api/sessions", response_model=List[str])
 async def list_sessions():
     """List all analysis sessions"""
-    sessions = []
-    for session_dir in config.WORKSPACE_ROOT.iterdir():
-        if session_dir.is_dir():
-            sessions.append(session_dir.name)
+    # DirEntry.is_dir uses the d_type from the listing instead of a stat per entry
+    with os.scandir(config.WORKSPACE_ROOT) as entries:
+        sessions = [entry.name for entry in entries if entry.is_dir(follow_symlinks=False)]
     return sorted(sessions, reverse=True)
 
 
+@app.post("/api/sessions/batch", response_model=Dict[str, SessionStatus])
+async def get_session_statuses(request: Optional[SessionBatchRequest] = None):
+    """Get the status of several sessions (all by default) in one round trip"""
+    existing = await list_sessions()
+    if request and request.session_ids is not None:
+        # Only ids naming an existing workspace; anything else (paths, "..") is dropped
+        known = set(existing)
+        session_ids = [sid for sid in dict.fromkeys(request.session_ids) if sid in known]
+    else:
+        session_ids = existing
+    statuses = await asyncio.gather(
+        *(asyncio.to_thread(_session_status, session_id) for session_id in session_ids)
+    )
+    # Unknown sessions are left out
+    return {
+        session_id: status
+        for session_id, status in zip(session_ids, statuses)
+        if status is not None
+    }
+
+
 @app.get("/api/sessions/{session_id}", response_model=SessionStatus)
 async def get_session_status(session_id: str):
     """Get status of a specific session"""
+    status = _session_status(session_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return status
+
+
+def _session_status(session_id: str) -> Optional[SessionStatus]:
+    """Build the status of a session, or None if it has no workspace"""
+    # A session id is a single directory name under WORKSPACE_ROOT, never a path
+    if session_id in (".", "..") or Path(session_id).name != session_id:
+        return None
     workspace_path = config.WORKSPACE_ROOT / session_id
     
-    if not workspace_path.exists():
-        raise HTTPException(status_code=404, detail="Session not found")
+    try:
+        workspace_stat = workspace_path.stat()
+    except FileNotFoundError:
+        _file_list_cache.pop(session_id, None)
+        _plan_cache.pop(session_id, None)
+        return None
+    if not stat.S_ISDIR(workspace_stat.st_mode):
+        return None
     
     # Read plan if exists
-    plan = None
-    plan_file = workspace_path / "plan.json"
-    if plan_file.exists():
-        with open(plan_file, 'r') as f:
-            plan = json.load(f)
+    plan = _read_session_plan(session_id, workspace_path / "plan.json")
     
     # List files
-    files = []
-    for file_path in workspace_path.rglob("*"):
-        if file_path.is_file():
-            files.append(str(file_path.relative_to(workspace_path)))
+    files = _list_session_files(session_id, str(workspace_path), workspace_stat.st_mtime_ns)
     
     # Determine status
     status = "in_progress"
@@ -140,8 +314,8 @@ async def get_session_status(session_id: str):
         user_request=active_sessions.get(session_id, {}).get("request", "Unknown"),
         plan=plan,
         files=files,
-        created_at=str(workspace_path.stat().st_ctime),
-        updated_at=str(workspace_path.stat().st_mtime)
+        created_at=str(workspace_stat.st_ctime),
+        updated_at=str(workspace_stat.st_mtime)
     )
 
 
@@ -163,23 +337,43 @@ async def get_file(session_id: str, file_path: str):
 
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    """WebSocket for real-time updates"""
+    """WebSocket for real-time updates: the current status, then each change as it happens"""
     await websocket.accept()
     
+    queue: asyncio.Queue = asyncio.Queue()
+    _subscribers.setdefault(session_id, set()).add(queue)
+    # Clients don't send anything; reading only tells us when they disconnect
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
     try:
+        if session_id in active_sessions:
+            await websocket.send_json(_status_message(session_id))
         while True:
-            # Send status updates
-            if session_id in active_sessions:
-                status = active_sessions[session_id].get("status")
-                await websocket.send_json({
-                    "type": "status_update",
-                    "session_id": session_id,
-                    "status": status
-                })
-            
-            await asyncio.sleep(2)
+            next_message = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait(
+                {next_message, disconnected},
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnected in done:
+                next_message.cancel()
+                break
+            await websocket.send_json(next_message.result())
     except WebSocketDisconnect:
         pass
+    finally:
+        disconnected.cancel()
+        subscribers = _subscribers.get(session_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del _subscribers[session_id]
+
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    """Return once the client closes the WebSocket"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
 
 
 def get_html_content() -> str:
@@ -470,8 +664,14 @@ def get_html_content() -> str:
             const container = document.getElementById('sessionsList');
             
             try {
-                const response = await fetch('/api/sessions');
-                const sessions = await response.json();
+                // One request for every session's status
+                const response = await fetch('/api/sessions/batch', {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({})
+                });
+                const statuses = await response.json();
+                const sessions = Object.keys(statuses);
                 
                 if (sessions.length === 0) {
                     container.innerHTML = '<p style="text-align:center;color:#999;">No sessions yet. Start your first analysis above!</p>';
@@ -481,8 +681,7 @@ def get_html_content() -> str:
                 container.innerHTML = '';
                 
                 for (const sessionId of sessions) {
-                    const statusResponse = await fetch(`/api/sessions/${sessionId}`);
-                    const status = await statusResponse.json();
+                    const status = statuses[sessionId];
                     
                     const item = document.createElement('div');
                     item.className = 'session-item';
@@ -525,10 +724,14 @@ def get_html_content() -> str:
 
 
 if __name__ == "__main__":
+    import importlib.util
     import uvicorn
     uvicorn.run(
         "main:app",
         host=config.HOST,
         port=config.PORT,
-        reload=True
+        reload=config.SERVER_RELOAD,
+        workers=config.SERVER_WORKERS,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11"
     )
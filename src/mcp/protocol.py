@@ -3,7 +3,7 @@ Model Context Protocol (MCP) Implementation
 Standardized communication protocol for agent-tool interaction
 """
 from typing import Any, Dict, List, Optional, Union, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from enum import Enum
 
@@ -85,6 +85,9 @@ class AgentState(BaseModel):
 
 class WorkflowPlan(BaseModel):
     """Structured plan from Planner agent"""
+    # Plans are replaced rather than edited, which lets consumers cache per plan object
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     plan_id: str
     user_request: str
     steps: List[Dict[str, Any]]  # [{"step_number": 1, "objective": "...", "required_tools": [...]}]
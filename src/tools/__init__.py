@@ -2,8 +2,9 @@
 Tool Registry
 Manages all available tools in the system
 """
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+import asyncio
 from src.tools.base import BaseTool
 from src.tools.web_search import WebSearchTool
 from src.tools.file_tools import (
@@ -23,6 +24,14 @@ class ToolRegistry:
     def __init__(self, workspace_root: Path):
         self.workspace_root = workspace_root
         self.tools: Dict[str, BaseTool] = {}
+        self._definitions_cache: Dict[Tuple[str, ...], List[ToolDefinition]] = {}
+        self._descriptions_cache: Dict[str, str] = {}
+        # Tools with shared side effects (workspace writes, stateful sandbox sessions)
+        # execute one call at a time even when an agent dispatches calls concurrently
+        self._tool_locks: Dict[str, asyncio.Lock] = {
+            "file_saver": asyncio.Lock(),
+            "python_execution": asyncio.Lock()
+        }
         self._initialize_tools()
     
     def _initialize_tools(self):
@@ -52,6 +61,10 @@ class ToolRegistry:
             raise ValueError(f"Tool '{name}' not found")
         return self.tools[name]
     
+    def get_tool_lock(self, name: str) -> Optional[asyncio.Lock]:
+        """Get the lock serializing calls to a tool, or None if it may run concurrently"""
+        return self._tool_locks.get(name)
+    
     def get_all_tools(self) -> Dict[str, BaseTool]:
         """Get all tools"""
         return self.tools
@@ -64,11 +77,30 @@ class ToolRegistry:
         if tool_names is None:
             tool_names = list(self.tools.keys())
         
-        return [
-            self.tools[name].get_definition()
-            for name in tool_names
-            if name in self.tools
-        ]
+        # Definitions are static once tools are registered, so build them once per tool set
+        key = tuple(tool_names)
+        definitions = self._definitions_cache.get(key)
+        if definitions is None:
+            definitions = [
+                self.tools[name].get_definition()
+                for name in tool_names
+                if name in self.tools
+            ]
+            self._definitions_cache[key] = definitions
+        
+        # Return a copy so callers can extend the list without touching the cache
+        return list(definitions)
+    
+    def get_descriptions(self, agent_type: str) -> str:
+        """Get a "- name: description" line per tool available to an agent type"""
+        descriptions = self._descriptions_cache.get(agent_type)
+        if descriptions is None:
+            descriptions = "\n".join(
+                f"- {name}: {self.get_tool(name).get_definition().description}"
+                for name in self.get_tools_for_agent(agent_type)
+            )
+            self._descriptions_cache[agent_type] = descriptions
+        return descriptions
     
     def get_tools_for_agent(self, agent_type: str) -> List[str]:
         """Get list of tool names available to a specific agent type"""
@@ -201,13 +201,27 @@ class WorkflowEngine:
         prefix = "SUCCESS" if success else "STATUS"
         return f"{prefix}: {line or 'No further details provided.'}"
 
+    def _report_progress(self, progress_queue: Optional[asyncio.Queue], message: str):
+        """Send a progress message to the caller's queue, or print it when none is attached"""
+        if progress_queue is None:
+            print(message)
+        else:
+            progress_queue.put_nowait(message)
+
     async def execute_workflow(
         self,
         user_request: str,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        progress_queue: Optional[asyncio.Queue] = None
     ) -> MCPContext:
         """
         Execute complete workflow for a user request
+        
+        Args:
+            user_request: The user's analysis request
+            session_id: Optional session ID (derived from the request if omitted)
+            progress_queue: Optional queue receiving progress messages as they happen;
+                when omitted, progress is printed to stdout
         """
         
         # Create session
@@ -223,7 +237,7 @@ class WorkflowEngine:
         
         # Initialize journal
         journal_path = self._initialize_journal(workspace_path, session_id, user_request)
-        print(f"[{session_id}] Initialized journal: {journal_path}")
+        self._report_progress(progress_queue, f"[{session_id}] Initialized journal: {journal_path}")
         
         # Initialize context
         context = MCPContext(
@@ -309,12 +323,12 @@ class WorkflowEngine:
                 plan_step = decision.get("plan_step")
                 reasoning = decision.get("reasoning", "")
                 
-                print(f"[{session_id}] Orchestrator decision -> agent={next_agent}, plan_step={plan_step}")
+                self._report_progress(progress_queue, f"[{session_id}] Orchestrator decision -> agent={next_agent}, plan_step={plan_step}")
                 if reasoning:
                     preview = reasoning.strip()
                     if len(preview) > 400:
                         preview = preview[:397] + "..."
-                    print(f"[{session_id}] Decision rationale:\n{preview}")
+                    self._report_progress(progress_queue, f"[{session_id}] Decision rationale:\n{preview}")
                 
                 if not next_agent:
                     raise ValueError("Orchestrator did not provide NEXT_AGENT.")
@@ -337,14 +351,14 @@ class WorkflowEngine:
                 
                 if next_agent == "planner":
                     context.status = "planning"
-                    print(f"[{session_id}] Planner selected to create or update plan...")
+                    self._report_progress(progress_queue, f"[{session_id}] Planner selected to create or update plan...")
                     plan = await planner.create_plan(user_request)
                     context.plan = plan
                     plan_step_status = {}
                     plan_file = workspace_path / "plan.json"
                     with open(plan_file, 'w') as f:
                         json.dump(plan.dict(), f, indent=2, default=str)
-                    print(f"[{session_id}] Plan created with {len(plan.steps)} steps")
+                    self._report_progress(progress_queue, f"[{session_id}] Plan created with {len(plan.steps)} steps")
                     with open(journal_path, 'a') as f:
                         f.write(f"""## Planning Phase
 
@@ -361,11 +375,11 @@ class WorkflowEngine:
                 if next_agent == "executor":
                     context.status = "executing"
                     objective = task_description or "(No objective provided)"
-                    print(f"[{session_id}] Delegating to Executor: {objective[:120]}...")
+                    self._report_progress(progress_queue, f"[{session_id}] Delegating to Executor: {objective[:120]}...")
                     files_before = set(f.name for f in workspace_path.iterdir() if f.is_file())
                     enhanced_task = self._append_existing_files(objective, files_before)
                     result = await executor.execute_task(enhanced_task)
-                    print(f"[{session_id}] Executor success: {result.get('success')}")
+                    self._report_progress(progress_queue, f"[{session_id}] Executor success: {result.get('success')}")
                     files_after = set(f.name for f in workspace_path.iterdir() if f.is_file())
                     files_created = list(files_after - files_before)
                     journal_step_counter += 1
@@ -380,13 +394,14 @@ class WorkflowEngine:
                 
                 if next_agent == "strategy_refinement":
                     context.status = "refining"
-                    print(f"[{session_id}] Initiating strategy refinement loop...")
+                    self._report_progress(progress_queue, f"[{session_id}] Initiating strategy refinement loop...")
                     files_before = set(f.name for f in workspace_path.iterdir() if f.is_file())
                     await self._execute_strategy_refinement(
                         workspace_path,
                         tool_registry,
                         user_request,
-                        journal_path
+                        journal_path,
+                        progress_queue
                     )
                     strategy_iterations_completed = config.MAX_REFINEMENT_ITERATIONS
                     files_after = set(f.name for f in workspace_path.iterdir() if f.is_file())
@@ -419,7 +434,7 @@ class WorkflowEngine:
                 
                 if next_agent == "writer":
                     context.status = "reporting"
-                    print(f"[{session_id}] Delegating to Writer for final report...")
+                    self._report_progress(progress_queue, f"[{session_id}] Delegating to Writer for final report...")
                     files_before = set(f.name for f in workspace_path.iterdir() if f.is_file())
                     with open(journal_path, 'r') as f:
                         journal_content = f.read()
@@ -451,7 +466,7 @@ class WorkflowEngine:
                     )
                     if report_exists:
                         final_report_created = True
-                        print(f"[{session_id}] ✓ Final report created: {report_path}")
+                        self._report_progress(progress_queue, f"[{session_id}] ✓ Final report created: {report_path}")
                         with open(journal_path, 'a') as f:
                             f.write(f"""## Final Report Generation
 
@@ -465,7 +480,7 @@ class WorkflowEngine:
 """)
                         writer_summary = f"Final report created at {report_path.name}."
                     else:
-                        print(f"[{session_id}] ⚠️  Warning: final_report.md was not created")
+                        self._report_progress(progress_queue, f"[{session_id}] ⚠️  Warning: final_report.md was not created")
                         writer_summary = "Writer completed task but final_report.md not found."
                     if isinstance(plan_step, int):
                         plan_step_status[plan_step] = {
@@ -482,7 +497,7 @@ class WorkflowEngine:
                         "Maximum orchestration decisions reached before workflow completion. "
                         "Review plan and orchestrator instructions."
                     )
-                    print(f"[{session_id}] ⚠️ {warning}")
+                    self._report_progress(progress_queue, f"[{session_id}] ⚠️ {warning}")
                     with open(journal_path, 'a') as f:
                         f.write(f"""## ⚠️ Workflow Incomplete
 
@@ -493,18 +508,18 @@ class WorkflowEngine:
 """)
 
             if context.status == "completed":
-                print(f"[{session_id}] Workflow completed successfully!")
+                self._report_progress(progress_queue, f"[{session_id}] Workflow completed successfully!")
             elif context.status == "failed":
-                print(f"[{session_id}] Workflow ended in FAILED state.")
-            print(f"[{session_id}] Journal saved to: {journal_path}")
+                self._report_progress(progress_queue, f"[{session_id}] Workflow ended in FAILED state.")
+            self._report_progress(progress_queue, f"[{session_id}] Journal saved to: {journal_path}")
             
             if context.status == "completed" and not final_report_created:
-                print(f"[{session_id}] ⚠️ Completed state reached without final report. Verify requirements.")
+                self._report_progress(progress_queue, f"[{session_id}] ⚠️ Completed state reached without final report. Verify requirements.")
             
             return context
         except Exception as e:
             context.status = "failed"
-            print(f"[{session_id}] Workflow failed: {str(e)}")
+            self._report_progress(progress_queue, f"[{session_id}] Workflow failed: {str(e)}")
             with open(journal_path, 'a') as f:
                 f.write(f"""## ❌ Workflow Failed
 
@@ -519,7 +534,8 @@ class WorkflowEngine:
         workspace_path: Path,
         tool_registry: ToolRegistry,
         user_request: str,
-        journal_path: Path
+        journal_path: Path,
+        progress_queue: Optional[asyncio.Queue] = None
     ):
         """Execute 3-iteration strategy refinement loop"""
         
@@ -558,7 +574,7 @@ class WorkflowEngine:
         feedback = None
         
         for iteration in range(1, config.MAX_REFINEMENT_ITERATIONS + 1):
-            print(f"  Strategy Iteration {iteration}/3...")
+            self._report_progress(progress_queue, f"  Strategy Iteration {iteration}/3...")
             
             # Log iteration start to journal
             with open(journal_path, 'a') as f:
@@ -567,7 +583,7 @@ class WorkflowEngine:
 """)
             
             # 1. Synthesize strategy
-            print(f"    - Generating strategy code...")
+            self._report_progress(progress_queue, "    - Generating strategy code...")
             synth_result = await synthesizer.generate_strategy(
                 user_request=user_request,
                 iteration=iteration,
@@ -582,7 +598,7 @@ class WorkflowEngine:
 """)
             
             # 2. Evaluate strategy
-            print(f"    - Running backtest and evaluation...")
+            self._report_progress(progress_queue, "    - Running backtest and evaluation...")
             eval_task = f"""Execute the strategy in strategy_v{iteration}.py and evaluate its performance.
 
 REQUIRED TASKS:
@@ -618,7 +634,7 @@ This is iteration {iteration} of 3. Be thorough and analytical."""
 """)
             
             # 3. Judge and provide feedback
-            print(f"    - Generating feedback...")
+            self._report_progress(progress_queue, "    - Generating feedback...")
             judge_result = await judger.evaluate_strategy(iteration)
             
             # Load feedback for next iteration
@@ -645,4 +661,4 @@ This is iteration {iteration} of 3. Be thorough and analytical."""
 
 """)
         
-        print(f"  Strategy refinement complete (3 iterations)")
+        self._report_progress(progress_queue, "  Strategy refinement complete (3 iterations)")